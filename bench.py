@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+
+"""bench.py: Seed a journal database and time every command path through the main.py handlers."""
+
+# Standard Library
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+# Local Modules
+import main
+from dbpool import ConnectionPool
+from queries import Queries
+from reviewer_index import REVIEWER_INDEX
+from sqlite_backend import SQLiteConnection
+
+# ICodes drawn from when seeding reviewers and manuscripts
+ICODES = list(range(1, 21))
+
+# main.py must reach its prompt (and exit again) within this many ms, without a database
+STARTUP_BUDGET_MS = 200
+
+
+class Recorder:
+    """Per-command latencies and statement counts, summarised by `report`."""
+
+    def __init__(self, db: Queries) -> None:
+        self.db = db
+        self.latencies: Dict[str, List[float]] = {}
+        self.statements: Dict[str, int] = {}
+
+    def run(self, command: str, handler: Callable, *args) -> object:
+        executions = self.db.executions
+        start = time.perf_counter()
+        # handlers report through print; keep the benchmark output clean
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = handler(*args)
+        self.latencies.setdefault(command, []).append(time.perf_counter() - start)
+        self.statements[command] = self.statements.get(command, 0) + self.db.executions - executions
+        return result
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        summary = {}
+        for command, latencies in self.latencies.items():
+            ordered = sorted(latencies)
+            total = sum(ordered)
+            summary[command] = {
+                'count': len(ordered),
+                'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+                'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+                'queries_per_command': round(self.statements[command] / len(ordered), 2),
+                'throughput_per_s': round(len(ordered) / total, 1) if total else None,
+            }
+        return summary
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def measure_startup(runs: int, budget_ms: float) -> Dict[str, object]:
+    """Time `main.py` from a cold interpreter to its prompt and straight back out via `exit`."""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, script], input=b'exit\n', stdout=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    ordered = sorted(timings)
+    p50_ms = round(percentile(ordered, 50) * 1000, 3)
+    return {
+        'runs': runs,
+        'p50_ms': p50_ms,
+        'max_ms': round(ordered[-1] * 1000, 3),
+        'budget_ms': budget_ms,
+        'within_budget': p50_ms <= budget_ms,
+    }
+
+
+def connect(args: argparse.Namespace) -> Tuple[Queries, str]:
+    """Open the benchmark's connection; return it and the name of the backend it uses."""
+    if args.backend == 'sqlite':
+        return Queries(SQLiteConnection(args.database)), 'sqlite'
+    pool = ConnectionPool(args.config)
+    return pool.acquire(), pool.backend
+
+
+def run(args: argparse.Namespace) -> Dict[str, object]:
+    with tempfile.TemporaryDirectory(prefix='journal-bench-') as workdir:
+        return run_in(args, workdir)
+
+
+def run_in(args: argparse.Namespace, workdir: str) -> Dict[str, object]:
+    rng = random.Random(args.seed)
+    db, backend = connect(args)
+    recorder = Recorder(db)
+
+    # register: authors and one editor through the same handler as the shell
+    author_logins = []
+    for i in range(args.authors):
+        author_logins.append(recorder.run('register', main.handle_register, ['author', f'Author{i}', 'Bench', f'author{i}@example.com', 'Bench U'], db))
+    editor_login = recorder.run('register', main.handle_register, ['editor', 'Editor', 'Bench'], db)
+
+    # import: the reviewer pool in one bulk load
+    reviewer_csv = os.path.join(workdir, 'reviewers.csv')
+    with open(reviewer_csv, 'w', newline='') as file:
+        writer = csv.writer(file)
+        for i in range(args.reviewers):
+            writer.writerow([f'Reviewer{i}', 'Bench'] + rng.sample(ICODES, 3))
+    reviewer_logins = recorder.run('import', main.handle_import, ['reviewers', reviewer_csv, os.path.join(workdir, 'logins.csv')], db)
+
+    # login + submit: each manuscript by a random author
+    document = os.path.join(workdir, 'manuscript.txt')
+    with open(document, 'wb') as file:
+        file.write(os.urandom(args.document_bytes))
+    author_sessions = {}
+    for login_id in author_logins:
+        session = author_sessions[login_id] = main.Session()
+        recorder.run('login', main.handle_login, [str(login_id)], db, session)
+    manuscript_ids = []
+    for i in range(args.manuscripts):
+        session = author_sessions[rng.choice(author_logins)]
+        manuscript_ids.append(recorder.run('submit', main.handle_submit, db, session, [f'Manuscript {i}', 'Bench U', str(rng.choice(ICODES)), document]))
+
+    # assign: every manuscript to the least-loaded matching reviewers
+    editor = main.Session()
+    recorder.run('login', main.handle_login, [str(editor_login)], db, editor)
+    REVIEWER_INDEX.load(db)
+    assignments: Dict[int, List[int]] = {}
+    for manuscript_id in manuscript_ids:
+        for reviewer_id in recorder.run('assign', main.handle_assign, db, editor, [str(manuscript_id)]):
+            assignments.setdefault(reviewer_id, []).append(manuscript_id)
+
+    # status: authors and the editor dashboard
+    for session in author_sessions.values():
+        recorder.run('status', main.handle_status, db, session, [])
+    for _ in range(args.editor_status_runs):
+        recorder.run('status_editor', main.handle_status, db, editor, [])
+
+    # accept / reject: every assigned review, as its reviewer
+    reviewer_sessions = {}
+    for login_id in reviewer_logins:
+        session = main.Session()
+        recorder.run('login', main.handle_login, [str(login_id)], db, session)
+        reviewer_sessions[session.role_id] = session
+    for reviewer_id, manuscript_ids in assignments.items():
+        for manuscript_id in manuscript_ids:
+            verb = rng.choice(('accept', 'reject'))
+            handler = main.handle_accept if verb == 'accept' else main.handle_reject
+            scores = [str(rng.randint(1, 10)) for _ in range(4)]
+            recorder.run(verb, handler, db, reviewer_sessions[reviewer_id], [str(manuscript_id)] + scores)
+
+    return {
+        'backend': backend,
+        'startup': measure_startup(args.startup_runs, args.startup_budget_ms) if args.startup_runs else None,
+        'seed': {
+            'authors': args.authors,
+            'reviewers': args.reviewers,
+            'manuscripts': args.manuscripts,
+            'document_bytes': args.document_bytes,
+            'random_seed': args.seed,
+        },
+        'prepares': db.prepares,
+        'commands': recorder.report(),
+    }
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark every journal command path")
+    parser.add_argument('--backend', choices=('sqlite', 'config'), default='sqlite',
+                        help="throwaway sqlite database (default) or the backend the config file selects, "
+                             "[mysql] or [sqlite]")
+    parser.add_argument('--database', default=':memory:', help="sqlite database file (default: in memory)")
+    parser.add_argument('--config', default='Team22Lab2.ini', help="config file for --backend config")
+    parser.add_argument('--authors', type=int, default=100)
+    parser.add_argument('--reviewers', type=int, default=300)
+    parser.add_argument('--manuscripts', type=int, default=500)
+    parser.add_argument('--document-bytes', type=int, default=4096)
+    parser.add_argument('--editor-status-runs', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=61)
+    parser.add_argument('--startup-runs', type=int, default=5, help="cold starts of main.py to time (0 to skip)")
+    parser.add_argument('--startup-budget-ms', type=float, default=STARTUP_BUDGET_MS,
+                        help=f"fail (exit status 1) if the median cold start exceeds this (default: {STARTUP_BUDGET_MS})")
+    parser.add_argument('--output', metavar='FILE', help="write the JSON report to FILE instead of stdout")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    results = run(args)
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(report + '\n')
+    else:
+        print(report)
+    if results['startup'] and not results['startup']['within_budget']:
+        sys.exit(1)
@@ -0,0 +1,140 @@
+"""cache.py: Read-through LRU/TTL cache for profile and status reads, invalidated by the write handlers."""
+
+# Standard Library
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Sequence, Set, Tuple, Type, Union
+
+# Local Modules
+from dbconfig import read_optional_section
+from models import Record
+from queries import Queries
+
+CACHE_DEFAULTS = {
+    'max_entries': 10000,  # least recently used entries are evicted past this
+    'ttl': 60,             # seconds an entry is trusted, to bound staleness from other processes
+    'max_rows': 1000,      # listings longer than this are streamed, never cached
+}
+
+
+def read_cache_config(filename: str = 'Team22Lab2.ini') -> Dict[str, int]:
+    return {key: int(value) for key, value in read_optional_section(filename, 'cache', CACHE_DEFAULTS).items()}
+
+
+class ReadCache:
+    """
+    LRU cache whose entries expire after `ttl` seconds. An entry may carry tags
+    (e.g. ('manuscript', 12)) so a write can drop every entry that mentions a row
+    without knowing the exact keys. `hits` and `misses` count lookups.
+    """
+
+    def __init__(self, max_entries: int = CACHE_DEFAULTS['max_entries'], ttl: float = CACHE_DEFAULTS['ttl'],
+                 max_rows: int = CACHE_DEFAULTS['max_rows']) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, Tuple[float, object, Tuple[Hashable, ...]]]' = OrderedDict()
+        self._tagged: Dict[Hashable, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, config: Dict[str, int]) -> None:
+        self.max_entries, self.ttl, self.max_rows = config['max_entries'], config['ttl'], config['max_rows']
+
+    def get(self, key: Hashable, default: object = None) -> object:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: object, tags: Iterable[Hashable] = ()) -> None:
+        tags = tuple(tags)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, *keys: Hashable) -> None:
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+
+    def invalidate_tag(self, *tags: Hashable) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tagged.get(tag, ())):
+                    self._remove(key)
+
+    def reset_counters(self) -> None:
+        self.hits = self.misses = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tagged.clear()
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+    def report(self) -> List[str]:
+        lookups = self.hits + self.misses
+        rate = f"{self.hits / lookups:.0%}" if lookups else "-"
+        return [f"Cache: {len(self._entries)} entries, {self.hits} hits, {self.misses} misses (hit rate {rate})"]
+
+
+# shared by every session in the process
+READ_CACHE = ReadCache()
+
+
+def cached_fetchone(db: Queries, key: Hashable, tags: Iterable[Hashable], model: Type[Record],
+                    name: str, params: Sequence) -> Union[Record, None]:
+    """Read-through `db.fetchone`, as a `model` record; a missing row is not cached."""
+    record = READ_CACHE.get(key)
+    if record is None:
+        row = db.fetchone(name, params)
+        if row is not None:
+            record = model.from_row(row)
+            READ_CACHE.put(key, record, tags)
+    return record
+
+
+def stream_into_cache(db: Queries, key: Hashable, tags: Iterable[Hashable], model: Type[Record],
+                      record_tag: Callable[[Record], Hashable], name: str, params: Sequence,
+                      page_size: int) -> Iterator[Record]:
+    """
+    Stream statement `name` like `db.stream`, as `model` records, and once it is
+    exhausted cache them under `key` (tagged with `tags` plus `record_tag(record)`
+    for each record), unless there were more than READ_CACHE.max_rows of them.
+    """
+    collected = []
+    columns = None
+    for row in db.stream(name, params, page_size):
+        if columns is None:
+            columns = db.columns(name)
+        record = model.from_row(row, columns)
+        if collected is not None:
+            collected.append(record)
+            if len(collected) > READ_CACHE.max_rows:
+                collected = None
+        yield record
+    if collected is not None:
+        READ_CACHE.put(key, collected, list(tags) + [record_tag(record) for record in collected])
@@ -1,4 +1,14 @@
 from configparser import ConfigParser
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def _parse_config(filename):
+    """ Parse each configuration file once; later reads reuse the parser """
+    parser = ConfigParser()
+    parser.read(filename)
+    return parser
+
   
 def read_db_config(filename='Team22Lab2.ini', section='mysql'):
     """ Read database configuration file and return a dictionary object
@@ -9,8 +19,7 @@ def read_db_config(filename='Team22Lab2.ini', section='mysql'):
     """
 
     # create parser and read ini configuration file, default 'dbconfig.ini'
-    parser = ConfigParser()
-    parser.read(filename)
+    parser = _parse_config(filename)
  
     # get section, default to mysql
     dbconfig = {}
@@ -23,3 +32,20 @@ def read_db_config(filename='Team22Lab2.ini', section='mysql'):
  
     return dbconfig
 
+
+def has_section(filename, section):
+    """ Whether the configuration file has [section] (a missing file has none) """
+    return _parse_config(filename).has_section(section)
+
+
+def read_optional_section(filename, section, defaults):
+    """ Read an optional section of the configuration file
+    :param filename: name of the configuration file
+    :param section: section to read; if the file has none, every key takes its default
+    :param defaults: the section's keys and their default values
+    :return: a dictionary with every key in defaults, as read from the file where present
+    A malformed file still raises configparser.Error rather than passing for a missing section.
+    """
+    parser = _parse_config(filename)
+    values = dict(parser.items(section)) if parser.has_section(section) else {}
+    return {key: values.get(key, default) for key, default in defaults.items()}
@@ -0,0 +1,241 @@
+"""dbpool.py: Lazily-opened, bounded pool of MySQL (or local SQLite) connections configured from Team22Lab2.ini."""
+
+# Standard Library
+import getpass
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple, Union
+
+# Local Modules
+from cache import READ_CACHE, read_cache_config
+from dbconfig import has_section, read_db_config, read_optional_section
+from group_commit import GROUP_COMMIT, read_group_commit_config
+from instrumentation import STATS, read_instrumentation_config
+from queries import Error, Queries, driver_errors
+
+POOL_DEFAULTS = {
+    'pool_size': 4,            # max connections open at once
+    'connection_timeout': 10,  # seconds to wait for the server handshake
+    'acquire_timeout': 30,     # seconds to wait for a free connection
+    'idle_ping': 300,          # ping (and reconnect) connections idle longer than this
+}
+
+
+def read_pool_config(filename: str = 'Team22Lab2.ini') -> Dict[str, int]:
+    return {key: int(value) for key, value in read_optional_section(filename, 'pool', POOL_DEFAULTS).items()}
+
+
+SQLITE_DEFAULTS = {
+    'database': 'journal.db',  # or :memory:
+    'schema': '',              # empty for the bundled schema_sqlite.sql
+}
+
+
+def read_sqlite_config(filename: str = 'Team22Lab2.ini') -> Union[Dict[str, str], None]:
+    """
+    Read the optional [sqlite] section. Its presence selects the embedded SQLite
+    backend instead of [mysql]; `database` is the database file (default journal.db,
+    or :memory:) and `schema` the schema applied to it (default: the bundled one).
+    Return None if the section is absent.
+    """
+    if not has_section(filename, 'sqlite'):
+        return None
+    return read_optional_section(filename, 'sqlite', SQLITE_DEFAULTS)
+
+
+class ConnectionPool:
+    """
+    Hands out connections (wrapped in their `Queries`), opening them only when first needed.
+    At most `pool_size` connections exist; callers block (up to `acquire_timeout`)
+    when all are in use. A connection that sat idle longer than `idle_ping` seconds
+    is pinged before reuse, and one the server dropped mid-command is closed on
+    release rather than reused, so a server-side timeout is repaired transparently.
+    `backend` is 'mysql', or 'sqlite' when the config file has a [sqlite] section.
+    """
+
+    def __init__(self, filename: str = 'Team22Lab2.ini') -> None:
+        self.filename = filename
+        self.config: Dict[str, int] = None
+        self.backend: str = None
+        self._dbconfig: Dict[str, str] = None
+        self._slots: threading.BoundedSemaphore = None
+        self._idle: List[Tuple[Queries, float]] = []
+        self._lock = threading.Lock()
+
+    def configure(self) -> None:
+        """
+        Apply the config file's settings (pool, instrumentation, cache and group commit).
+        Cheap and idempotent; connecting (and any password prompt) waits for `acquire`.
+        """
+        with self._lock:
+            if self.config is not None:
+                return
+            config = read_pool_config(self.filename)
+            sqlite = read_sqlite_config(self.filename)
+            self.backend = 'mysql' if sqlite is None else 'sqlite'
+            # every connection to :memory: would be a separate, empty database
+            if sqlite is not None and sqlite['database'] == ':memory:':
+                config['pool_size'] = 1
+            STATS.configure(read_instrumentation_config(self.filename))
+            READ_CACHE.configure(read_cache_config(self.filename))
+            GROUP_COMMIT.configure(read_group_commit_config(self.filename))
+            self._slots = threading.BoundedSemaphore(config['pool_size'])
+            self.config = config
+
+    def _credentials(self) -> Dict[str, str]:
+        with self._lock:
+            if self._dbconfig is None:
+                if self.backend == 'sqlite':
+                    self._dbconfig = read_sqlite_config(self.filename)
+                else:
+                    dbconfig = read_db_config(self.filename)
+                    if dbconfig["password"] == "":
+                        dbconfig["password"] = getpass.getpass("database password ? :")
+                    self._dbconfig = dbconfig
+            return self._dbconfig
+
+    def _connect(self) -> Queries:
+        if self.backend == 'sqlite':
+            return self._connect_sqlite()
+        return self._connect_mysql()
+
+    def _connect_sqlite(self) -> Queries:
+        from sqlite_backend import SCHEMA_FILE, SQLiteConnection
+
+        dbconfig = self._credentials()
+        try:
+            conn = SQLiteConnection(dbconfig['database'], dbconfig['schema'] or SCHEMA_FILE)
+        except (OSError, sqlite3.Error) as err:
+            print(f"Unable to open SQLite database {dbconfig['database']}.")
+            raise Error(msg=str(err)) from err
+        return Queries(conn)
+
+    def _connect_mysql(self) -> Queries:
+        # imported on first connect, not at startup: the driver takes longer to import than the whole shell
+        from mysql.connector import MySQLConnection, Error as DriverError, errorcode
+
+        print("Connecting to MySQL database...")
+        try:
+            conn = MySQLConnection(connection_timeout=self.config['connection_timeout'], **self._credentials())
+        except DriverError as err:
+            print("connection failed.")
+            if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
+                print("Something is wrong with your user name or password\nTry Again\n")
+                # re-read the config (and re-prompt) on the next attempt
+                self._dbconfig = None
+            elif err.errno == errorcode.ER_BAD_DB_ERROR:
+                print("Database does not exist")
+            raise Error(msg=err.msg, errno=err.errno) from err
+        print("connection established.\n")
+        return Queries(conn, DriverError)
+
+    def acquire(self) -> Queries:
+        self.configure()
+        if not self._slots.acquire(timeout=self.config['acquire_timeout']):
+            raise Error(msg="Failed getting connection; pool exhausted")
+        try:
+            with self._lock:
+                db, last_used = self._idle.pop() if self._idle else (None, 0.0)
+            if db is None:
+                return self._connect()
+            if time.monotonic() - last_used > self.config['idle_ping']:
+                with driver_errors(db.driver_error):
+                    db.conn.ping(reconnect=True, attempts=2, delay=1)
+                db.revalidate()
+            return db
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, db: Queries) -> None:
+        """
+        Return `db` to the pool. Whatever transaction it still has open is rolled back:
+        commands commit their own writes, and with autocommit off even a read leaves a
+        snapshot open that would hide other connections' later commits from the next user.
+        """
+        if not db.lost:
+            try:
+                db.rollback()
+            except Error:
+                db.lost = True
+        if db.lost:
+            # the next acquire opens a fresh connection in its place
+            try:
+                db.close()
+            except Error:
+                pass
+        else:
+            with self._lock:
+                self._idle.append((db, time.monotonic()))
+        self._slots.release()
+
+    @contextmanager
+    def connection(self, lazy: bool = False) -> Iterator[Union[Queries, 'LazyQueries']]:
+        """
+        Check out a connection for the block. With `lazy`, the block gets a
+        LazyQueries that only checks one out when a statement first runs.
+        """
+        db = LazyQueries(self) if lazy else self.acquire()
+        try:
+            yield db
+        finally:
+            if not lazy:
+                self.release(db)
+            elif db.acquired is not None:
+                self.release(db.acquired)
+
+    def close(self) -> None:
+        """Close every idle connection. Connections still checked out are left alone."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for db, _ in idle:
+            try:
+                db.close()
+            except Error:
+                pass
+
+
+class LazyQueries:
+    """
+    Stands in for the `Queries` of a pooled connection that is acquired only when the
+    first statement runs, so a command rejected by its argument checks never touches
+    the database (or prompts for a password). Committing or rolling back before then
+    does nothing.
+    """
+
+    def __init__(self, pool: ConnectionPool) -> None:
+        # settings such as GROUP_COMMIT's must be in place before a handler consults them
+        pool.configure()
+        self.pool = pool
+        self.acquired: Queries = None
+
+    def _checkout(self) -> Queries:
+        if self.acquired is None:
+            self.acquired = self.pool.acquire()
+        return self.acquired
+
+    def __getattr__(self, name: str) -> object:
+        return getattr(self._checkout(), name)
+
+    @property
+    def defer_commits(self) -> bool:
+        # pooled connections are handed out with commits not deferred
+        return self.acquired is not None and self.acquired.defer_commits
+
+    @defer_commits.setter
+    def defer_commits(self, value: bool) -> None:
+        self._checkout().defer_commits = value
+
+    def commit(self) -> None:
+        if self.acquired is not None:
+            self.acquired.commit()
+
+    def flush(self) -> None:
+        if self.acquired is not None:
+            self.acquired.flush()
+
+    def rollback(self) -> None:
+        if self.acquired is not None:
+            self.acquired.rollback()
@@ -0,0 +1,147 @@
+"""group_commit.py: Write-behind group commit, so many sessions' registrations and submissions share one transaction."""
+
+# Standard Library
+import threading
+import time
+from typing import Callable, Dict, List, TypeVar
+
+# Local Modules
+from dbconfig import read_optional_section
+from queries import Error, Queries
+
+T = TypeVar('T')
+
+GROUP_COMMIT_DEFAULTS = {
+    'max_ops': 1,       # commit once this many writes are queued; 1 commits every write on its own
+    'max_wait_ms': 20,  # ... or once the oldest queued write has waited this long
+}
+
+
+def read_group_commit_config(filename: str = 'Team22Lab2.ini') -> Dict[str, int]:
+    return {key: int(value) for key, value in read_optional_section(filename, 'group_commit', GROUP_COMMIT_DEFAULTS).items()}
+
+
+class PendingWrite:
+    def __init__(self, write: Callable[[Queries], object]) -> None:
+        self.write = write
+        self.result: object = None
+        self.error: BaseException = None
+        self.done = threading.Event()
+
+
+class GroupCommit:
+    """
+    Runs write operations (functions of a `Queries`) so that concurrent callers share
+    one commit. The first caller to queue a write leads the group: it waits until
+    `max_ops` writes are queued or `max_wait_ms` has passed, then runs them all on its
+    own connection, each in a savepoint so a failure only undoes that write, and
+    commits once. Every caller blocks until that commit and then gets its own write's
+    result, or its exception. With `max_ops` at 1, or inside a batch (whose commits are
+    already grouped), a write simply runs and commits on the caller's connection.
+    `writes` and `commits` count what has gone through grouped.
+    """
+
+    def __init__(self, max_ops: int = GROUP_COMMIT_DEFAULTS['max_ops'],
+                 max_wait_ms: int = GROUP_COMMIT_DEFAULTS['max_wait_ms']) -> None:
+        self.max_ops = max_ops
+        self.max_wait_ms = max_wait_ms
+        self.writes = 0
+        self.commits = 0
+        # the group still taking writes; a full one is closed and the next write starts another
+        self._group: List[PendingWrite] = None
+        # groups formed but not yet committed
+        self._open_groups = 0
+        self._draining = False
+        self._cond = threading.Condition()
+
+    def configure(self, config: Dict[str, int]) -> None:
+        self.max_ops, self.max_wait_ms = config['max_ops'], config['max_wait_ms']
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_ops > 1
+
+    def run(self, db: Queries, write: Callable[[Queries], T]) -> T:
+        """Run `write(db)` atomically and return its result once it is committed."""
+        if not self.enabled or db.defer_commits:
+            with db.atomic():
+                result = write(db)
+            db.commit()
+            return result
+
+        pending = PendingWrite(write)
+        with self._cond:
+            leader = self._group is None
+            if leader:
+                group = self._group = [pending]
+                self._open_groups += 1
+                deadline = time.monotonic() + self.max_wait_ms / 1000
+                while len(group) < self.max_ops and not self._draining:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._group is group:
+                    self._group = None
+            else:
+                self._group.append(pending)
+                if len(self._group) >= self.max_ops:
+                    # full: later writes start a new group while this one commits
+                    self._group = None
+                    self._cond.notify_all()
+
+        if leader:
+            try:
+                self._commit_group(db, group)
+            finally:
+                with self._cond:
+                    self._open_groups -= 1
+                    self.writes += len(group)
+                    self.commits += 1
+                    self._cond.notify_all()
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _commit_group(self, db: Queries, group: List[PendingWrite]) -> None:
+        deferred, db.defer_commits = db.defer_commits, True
+        try:
+            for pending in group:
+                try:
+                    with db.atomic():
+                        pending.result = pending.write(db)
+                except Exception as err:
+                    pending.error = err
+            db.flush()
+        except Exception as err:
+            # the commit itself failed, so nothing in the group was stored
+            try:
+                db.rollback()
+            except Error:
+                pass
+            for pending in group:
+                pending.result, pending.error = None, pending.error or err
+        finally:
+            db.defer_commits = deferred
+            for pending in group:
+                pending.done.set()
+
+    def drain(self) -> None:
+        """Commit any queued writes now, without waiting out `max_wait_ms`, and wait for every commit in flight."""
+        with self._cond:
+            self._draining = True
+            self._cond.notify_all()
+            while self._open_groups:
+                self._cond.wait()
+            self._draining = False
+
+    def report(self) -> List[str]:
+        if not self.enabled:
+            return []
+        size = f"{self.writes / self.commits:.1f}" if self.commits else "-"
+        return [f"Group commit: {self.writes} writes in {self.commits} commits (avg {size} per commit)"]
+
+
+# shared by every session in the process
+GROUP_COMMIT = GroupCommit()
@@ -0,0 +1,179 @@
+"""index_advisor.py: EXPLAIN every statement main.py issues, flag full table scans and propose covering indexes."""
+
+# Standard Library
+import re
+import time
+from typing import Dict, List, Sequence, Tuple
+
+# Local Modules
+from queries import SIZED_STATEMENTS, STATEMENTS, Queries
+
+# Statements that read a whole table on purpose; their scans are reported but not indexed.
+EXPECTED_SCANS = {'reviewer_expertise_all'} | {name for name in STATEMENTS if name.startswith('export_')}
+
+# Lookups a statement causes that its own SQL does not spell out, as (table, key columns):
+# the ReviewStatus view filters REVIEW by reviewer, and deleting a reviewer cascades to REVIEW.
+INDIRECT_LOOKUPS: Dict[str, List[Tuple[str, Tuple[str, ...]]]] = {
+    'review_status': [('REVIEW', ('REVIEWER_reviewerID',))],
+    'resign_reviewer': [('REVIEW', ('REVIEWER_reviewerID',)), ('REVIEWER_EXPERTISE', ('REVIEWER_reviewerID',))],
+}
+
+# Widest index proposed; past this only the key columns are indexed, not the whole query.
+MAX_INDEX_COLUMNS = 4
+
+_TABLE = re.compile(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+`(\w+)`(?:\s+(?!ON\b|WHERE\b|LEFT\b|JOIN\b|SET\b|GROUP\b|ORDER\b|LIMIT\b)(\w+))?", re.IGNORECASE)
+_PREDICATE = re.compile(r"(?:(\w+)\.)?`(\w+)`\s*(>=|<=|=|>|<|IN\b|IS\b)", re.IGNORECASE)
+_COLUMN = re.compile(r"(?:(\w+)\.)?`(\w+)`")
+_CLAUSE_END = re.compile(r"\b(?:GROUP BY|ORDER BY|LIMIT)\b", re.IGNORECASE)
+
+
+class Scan:
+    """One full scan found in a statement's plan: the table it reads and the plan line that says so."""
+    __slots__ = ('statement', 'table', 'detail')
+
+    def __init__(self, statement: str, table: str, detail: str) -> None:
+        self.statement, self.table, self.detail = statement, table, detail
+
+
+def statement_templates() -> List[Tuple[str, str]]:
+    """(name, SQL) for every statement worth explaining; sized statements are built for two ids."""
+    templates = [(name, sql) for name, sql in STATEMENTS.items()
+                 if not sql.lstrip().upper().startswith(('INSERT', 'SET'))]
+    return templates + [(name, build(2)) for name, build in SIZED_STATEMENTS.items()]
+
+
+def table_aliases(sql: str) -> Dict[str, str]:
+    """Map every name a table goes by in `sql` (its own name and any alias) to the table."""
+    aliases = {}
+    for table, alias in _TABLE.findall(sql):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    return aliases
+
+
+def full_scans(db: Queries, name: str, sql: str) -> List[Scan]:
+    """EXPLAIN `sql` (with 1 for every parameter) and return the full table scans in its plan."""
+    columns, rows = db.explain(sql, [1] * sql.count('%s'))
+    aliases = table_aliases(sql)
+    scans = []
+    for row in rows:
+        if db.dialect == 'sqlite':
+            detail = row[columns.index('detail')]
+            match = re.match(r"SCAN (\w+)", detail)
+            if match and match.group(1) != 'CONSTANT':
+                scans.append(Scan(name, aliases.get(match.group(1), match.group(1)), detail))
+        else:
+            plan = dict(zip(columns, row))
+            table = plan.get('table')
+            # 'ALL' reads every row, 'index' every entry of an index
+            if plan.get('type') in ('ALL', 'index') and table and not table.startswith('<'):
+                detail = f"type={plan['type']} key={plan.get('key')} rows={plan.get('rows')}"
+                scans.append(Scan(name, aliases.get(table, table), detail))
+    return scans
+
+
+def proposed_columns(sql: str, table: str) -> Tuple[str, ...]:
+    """
+    Columns of an index on `table` serving `sql`: the columns it is filtered or joined
+    on (equalities first, ranges last), then, if that stays within MAX_INDEX_COLUMNS,
+    the other columns the query reads from it so the index covers the query.
+    """
+    aliases = table_aliases(sql)
+    single_table = len(set(aliases.values())) == 1
+
+    def own(prefix: str) -> bool:
+        return aliases.get(prefix) == table if prefix else single_table
+
+    upper = sql.upper()
+    starts = [index for index in (upper.find(' ON '), upper.find(' WHERE ')) if index >= 0]
+    if not starts:
+        return ()
+    conditions = sql[min(starts):]
+    end = _CLAUSE_END.search(conditions)
+    if end:
+        conditions = conditions[:end.start()]
+
+    equalities, ranges = [], []
+    for prefix, column, operator in _PREDICATE.findall(conditions):
+        if own(prefix):
+            target = ranges if operator in ('>', '<', '>=', '<=') else equalities
+            if column not in equalities + ranges:
+                target.append(column)
+    key = equalities + ranges
+    if not key:
+        return ()
+
+    # SELECT list and GROUP BY / ORDER BY columns, for a covering index
+    read = []
+    if upper.lstrip().startswith('SELECT') and not re.match(r"\s*SELECT\s+\*", sql, re.IGNORECASE):
+        select_list = sql[:upper.find(' FROM ')]
+        tail = sql[min(starts):][len(conditions):]
+        for prefix, column in _COLUMN.findall(select_list + ' ' + tail):
+            if own(prefix) and column not in key + read:
+                read.append(column)
+    if read and len(key) + len(read) <= MAX_INDEX_COLUMNS:
+        return tuple(key + read)
+    return tuple(key)
+
+
+def advise(db: Queries) -> Tuple[List[Tuple[str, List[Scan]]], Dict[str, Dict[Tuple[str, ...], List[str]]]]:
+    """
+    EXPLAIN every statement template. Return each statement's full scans, and the
+    proposed indexes as {table: {columns: [statements served]}}, where an index whose
+    columns are a prefix of another proposed on the same table is folded into it.
+    """
+    plans = []
+    wanted: Dict[str, Dict[Tuple[str, ...], List[str]]] = {}
+    templates = statement_templates()
+    tables = {table for _, sql in templates for table in table_aliases(sql).values()}
+    for name, sql in templates:
+        scans = full_scans(db, name, sql)
+        plans.append((name, scans))
+        if name in EXPECTED_SCANS:
+            continue
+        aliases = set(table_aliases(sql).values())
+        for scan in scans:
+            if scan.table in aliases:
+                lookups = [(scan.table, proposed_columns(sql, scan.table))]
+            else:
+                # read through a view or a cascade rather than the statement itself; inside
+                # a view the plan names the view's own alias, which says nothing about the table
+                lookups = [lookup for lookup in INDIRECT_LOOKUPS.get(name, [])
+                           if lookup[0] == scan.table or scan.table not in tables]
+            for table, columns in lookups:
+                if columns:
+                    wanted.setdefault(table, {}).setdefault(columns, []).append(name)
+
+    for table, indexes in wanted.items():
+        for columns in sorted(indexes, key=len):
+            wider = next((other for other in indexes if len(other) > len(columns) and other[:len(columns)] == columns), None)
+            if wider:
+                indexes[wider] += indexes.pop(columns)
+    return plans, wanted
+
+
+def migration_script(wanted: Dict[str, Dict[Tuple[str, ...], List[str]]], dialect: str) -> str:
+    lines = [
+        f"-- Indexes proposed by `advise` on {time.strftime('%Y-%m-%d %H:%M')} ({dialect} plans).",
+        "-- Each one removes a full table scan from the statements listed above it.",
+        "",
+    ]
+    if_not_exists = "IF NOT EXISTS " if dialect == 'sqlite' else ""
+    for table, indexes in sorted(wanted.items()):
+        for columns, statements in sorted(indexes.items()):
+            index = f"idx_{table}_{'_'.join(columns)}"[:64]
+            lines.append(f"-- {', '.join(sorted(set(statements)))}")
+            lines.append(f"CREATE INDEX {if_not_exists}`{index}` ON `{table}` ({', '.join(f'`{column}`' for column in columns)});")
+    return "\n".join(lines) + "\n"
+
+
+def plan_report(plans: Sequence[Tuple[str, List[Scan]]]) -> List[str]:
+    lines = []
+    for name, scans in plans:
+        if not scans:
+            lines.append(f"  ok    {name}")
+        for scan in scans:
+            flag = "scan*" if name in EXPECTED_SCANS else "SCAN"
+            lines.append(f"  {flag:<5} {name}: full scan of {scan.table} ({scan.detail})")
+    return lines
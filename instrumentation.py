@@ -0,0 +1,133 @@
+"""instrumentation.py: Per-command and per-statement query statistics plus a slow-query log."""
+
+# Standard Library
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Union
+
+# Local Modules
+from dbconfig import read_optional_section
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is unbounded.
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000]
+
+INSTRUMENTATION_DEFAULTS = {
+    'slow_query_ms': '200',
+    'slow_query_log': 'slow_queries.log',
+}
+
+
+def read_instrumentation_config(filename: str = 'Team22Lab2.ini') -> Dict[str, Union[float, str]]:
+    config = read_optional_section(filename, 'instrumentation', INSTRUMENTATION_DEFAULTS)
+    config['slow_query_ms'] = float(config['slow_query_ms'])
+    return config
+
+
+class StatementStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.rows = 0
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+
+    def add(self, seconds: float, rows: int) -> None:
+        self.count += 1
+        self.total += seconds
+        self.rows += rows
+        self.histogram[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, seconds * 1000)] += 1
+
+
+class CommandStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.queries = 0
+        self.prepares = 0
+        self.total = 0.0
+
+
+class QueryStats:
+    """
+    Collects what `Queries` reports about each statement it runs: latency (into a
+    histogram), rows returned, and which shell command issued it, plus how many
+    statements each command had the server prepare (parse). Statements slower
+    than the configured threshold are appended to the slow-query log as JSON lines.
+    """
+
+    def __init__(self) -> None:
+        self.statements: Dict[str, StatementStats] = {}
+        self.commands: Dict[str, CommandStats] = {}
+        self.slow_query_ms = float(INSTRUMENTATION_DEFAULTS['slow_query_ms'])
+        self.slow_query_log = INSTRUMENTATION_DEFAULTS['slow_query_log']
+        self._current = threading.local()
+        self._lock = threading.Lock()
+
+    def configure(self, config: Dict[str, Union[float, str]]) -> None:
+        self.slow_query_ms = config['slow_query_ms']
+        self.slow_query_log = config['slow_query_log']
+
+    @contextmanager
+    def command(self, name: str) -> Iterator[None]:
+        """Attribute every statement run by this thread inside the block to command `name`."""
+        self._current.command, self._current.queries, self._current.prepares = name, 0, 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stats = self.commands.setdefault(name, CommandStats())
+                stats.count += 1
+                stats.queries += self._current.queries
+                stats.prepares += self._current.prepares
+                stats.total += elapsed
+            self._current.command = None
+
+    def record_prepare(self) -> None:
+        """Count a statement prepared on the server against the running command."""
+        if getattr(self._current, 'command', None):
+            self._current.prepares += 1
+
+    def record(self, statement: str, seconds: float, rows: int) -> None:
+        command = getattr(self._current, 'command', None)
+        if command:
+            self._current.queries += 1
+        with self._lock:
+            self.statements.setdefault(statement, StatementStats()).add(seconds, rows)
+        if self.slow_query_log and seconds * 1000 >= self.slow_query_ms:
+            self._log_slow(statement, command, seconds, rows)
+
+    def _log_slow(self, statement: str, command: Union[str, None], seconds: float, rows: int) -> None:
+        entry = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'command': command,
+            'statement': statement,
+            'ms': round(seconds * 1000, 3),
+            'rows': rows,
+        }
+        with self._lock, open(self.slow_query_log, 'a') as log:
+            log.write(json.dumps(entry) + '\n')
+
+    def reset(self) -> None:
+        with self._lock:
+            self.statements.clear()
+            self.commands.clear()
+
+    def report(self) -> List[str]:
+        """Human-readable summary for the `stats` command."""
+        lines = ["Commands (count, statements per command, prepares per command, avg ms):"]
+        with self._lock:
+            for name, stats in sorted(self.commands.items()):
+                lines.append(f"  {name:<12} {stats.count:>7} {stats.queries / stats.count:>8.2f} "
+                             f"{stats.prepares / stats.count:>8.2f} {stats.total * 1000 / stats.count:>9.2f}")
+            lines.append("Statements (count, avg ms, rows, histogram by ms <=" + ",".join(map(str, HISTOGRAM_BOUNDS_MS)) + ",inf):")
+            for name, stats in sorted(self.statements.items(), key=lambda item: -item[1].total):
+                histogram = " ".join(map(str, stats.histogram))
+                lines.append(f"  {name:<28} {stats.count:>7} {stats.total * 1000 / stats.count:>9.2f} {stats.rows:>8}  [{histogram}]")
+        return lines
+
+
+# shared by every connection in the process
+STATS = QueryStats()
@@ -3,228 +3,345 @@
 """main.py: Description of what the program does."""
 
 # Standard Library
+import argparse
+import base64
 import cmd
-import getpass
+import csv
+import datetime
+import decimal
+import gzip
+import itertools
+import json
 import os
 import shlex
 import sys
-from typing import List, Union, Literal, Tuple
-
-# Third Party
-from mysql.connector import MySQLConnection, Error, errorcode, FieldType
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Union, Literal, Tuple
 
 # Local Modules
-from dbconfig import read_db_config
+from cache import READ_CACHE, cached_fetchone, stream_into_cache
+from dbpool import ConnectionPool
+from group_commit import GROUP_COMMIT
+from index_advisor import advise, migration_script, plan_report
+from instrumentation import STATS
+from models import Author, Editor, LoginRole, Manuscript, Record, Review, Reviewer, render
+from queries import EXPORT_SOURCES, NO_LIMIT, SCORE_COLUMNS, Error, Queries
+from reviewer_index import REVIEWER_INDEX
 
 __authors__ = "Giorgie McCombe and Nick Irwin"
 __credits__ = "MySQLTutorial, Charles Palmer"
 __date__ = "29 Oct 2022"
 
 
-def connect_to_db() -> MySQLConnection:
+class Session:
     """
-    Helper function to connect to MySQL database using Team**Lab2.ini config file.
-    Gracefully handle all errors in setting up connection.
+    Identity of the currently logged-in user, resolved once by `handle_login`.
+    Commands read the role from here instead of looking up LOGIN_TO_ROLE again.
     """
-    dbconfig = read_db_config()
-    if dbconfig["password"] == "":
-        dbconfig["password"] = getpass.getpass("database password ? :")
 
-    for key, value in dbconfig.items():
-        value = value if key != 'password' else ''
-        print(f"{key}: {value}")
-    print()
-    # print(dbconfig)
+    def __init__(self) -> None:
+        self.invalidate()
 
-    # Connect to the database
-    try:
-        print("Connecting to MySQL database...")
-        conn = MySQLConnection(**dbconfig)
+    def invalidate(self) -> None:
+        """Forget the logged-in user (on logout, resign or a failed login)."""
+        self.login_id: Union[int, None] = None
+        self.role_id: Union[int, None] = None
+        self.role_type: Union[Literal['author', 'editor', 'reviewer'], None] = None
+        self.profile: Union[Record, None] = None
 
-        if conn.is_connected():
-            print("connection established.")
-        else:
-            print("connection failed.")
+    def is_role(self, role_type: str) -> bool:
+        return bool(self.login_id) and self.role_type == role_type
 
-        return conn
 
-    except Error as err:
-        print("connection failed somehow")
-        if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
-            print("Something is wrong with your user name or password\nTry Again\n")
-        elif err.errno == errorcode.ER_BAD_DB_ERROR:
-            print("Database does not exist")
-        else:
-            print("Unexpected error")
-            print(err)
-            sys.exit(1)
+# per thread: whether the command now running reported a failure (see `report_failure`)
+_outcome = threading.local()
 
 
-def handle_register(args: List[str], conn: MySQLConnection) -> None:
+def report_failure(message: str) -> None:
+    """
+    Print why the current command failed. Handlers report every usage, validation and
+    database error through here, so `JournalApp.onecmd` can tell batch mode the command failed.
+    """
+    _outcome.failed = True
+    print(message)
+
+
+def handle_register(args: List[str], db: Queries) -> Union[int, None]:
     """
     Handle specific `register <author | editor | reviewer>` case input.
-    Open and close MySQLConnection.cursor appropriately.
+    The role, its expertise and its login id are written together through GROUP_COMMIT.
+    Return the new login id, if registration succeeded.
     """
-    mycursor = conn.cursor(buffered=True)
-    role_id = None
+    fields = None
+    i_codes: List[int] = []
     if not args:
-        print("Invalid number of arguments.\n **Usage:** register <author | editor | reviewer>\n")
+        report_failure("Invalid number of arguments.\n **Usage:** register <author | editor | reviewer>\n")
         return
     role_type = args[0]
     if role_type == "author":
         if len(args) != 5:
-            print(
+            report_failure(
                 "Invalid number of arguments.\n **Usage:** register author <fname> <lname> <email> <affiliation>\n"
             )
         else:
-            role_id = register_author(args[1:], mycursor)
+            fields = args[1:5]
 
     elif role_type == "editor":
         if len(args) != 3:
-            print(
+            report_failure(
                 "Invalid number of arguments.\n **Usage:** register editor <fname> <lname>\n"
             )
         else:
-            role_id = register_editor(args[1:], mycursor)
+            fields = args[1:3]
 
     elif role_type == "reviewer":
         if len(args) < 4 or len(args) > 6:
-            print(
+            report_failure(
                 "Invalid number of arguments.\n **Usage:** register reviewer <fname> <lname> <ICode 1> <ICode 2> <ICode 3>\n"
             )
         else:
-            role_id = register_reviewer(args[1:], mycursor)
-            record_reviewer_expertise(role_id, [int(word) for word in args[3:]], mycursor)
+            fields = args[1:3]
+            i_codes = [int(word) for word in args[3:]]
 
     else:
-        print("Invalid argument.\n **Usage:** register <author | editor | reviewer>\n")
+        report_failure("Invalid argument.\n **Usage:** register <author | editor | reviewer>\n")
 
-    if role_id:
-        login_id = register_unique_id(role_id, role_type, mycursor)
-        if login_id:
-            print(f"Successfully registered {role_type}.\n")
-            print(f"## Your unique login id: `{login_id}` ##\n")
+    if fields is None:
+        return
+    try:
+        role_id, login_id = GROUP_COMMIT.run(db, lambda db: write_registration(role_type, fields, i_codes, db))
+    except Error as err:
+        report_failure(f"{err.msg}\n")
+        return
 
-    conn.commit()
-    mycursor.close()
+    if role_type == "reviewer":
+        REVIEWER_INDEX.add_reviewer(role_id, i_codes)
+    print(f"Successfully registered {role_type}.\n")
+    print(f"## Your unique login id: `{login_id}` ##\n")
+    return login_id
 
 
-def register_unique_id(role_id: int, role_type: str, cursor: MySQLConnection.cursor) -> Union[int, None]:
-    try:
-        query = "INSERT INTO `LOGIN_TO_ROLE` (`roleID`, `role_type`) VALUES ('{}','{}');".format(role_id, role_type)
-        # print("-->",query,"<--", end='')
-        cursor.execute(query)
-    except Error as err:
-        print(f"{err.msg}\n")
-    else:
-        return cursor.lastrowid
+def write_registration(role_type: str, fields: List[str], i_codes: List[int], db: Queries) -> Tuple[int, int]:
+    """Insert the role row, its expertise and its login; return (role id, login id)."""
+    register = getattr(sys.modules[__name__], f'register_{role_type}')
+    role_id = register(fields, db)
+    if i_codes:
+        record_reviewer_expertise(role_id, i_codes, db)
+    return role_id, register_unique_id(role_id, role_type, db)
 
 
-def register_author(auth: List[str], cursor: MySQLConnection.cursor) -> Union[int, None]:
-    try:
-        query = "INSERT INTO `PRIMARY_AUTHOR` (`f_name`, `l_name`, `email`, `affiliation`) VALUES ('{}','{}','{}','{}');".format(auth[0], auth[1], auth[2], auth[3])
-        # print("-->",query,"<--", end='')
-        cursor.execute(query)
-    except Error as err:
-        print(f"{err.msg}\n")
-    else:
-        return cursor.lastrowid
+def register_unique_id(role_id: int, role_type: str, db: Queries) -> int:
+    return db.execute('register_unique_id', (role_id, role_type)).lastrowid
+
+
+def register_author(auth: List[str], db: Queries) -> int:
+    return db.execute('register_author', auth[:4]).lastrowid
 
 
-def register_editor(ed: List[str], cursor: MySQLConnection.cursor) -> Union[int, None]:
+def register_editor(ed: List[str], db: Queries) -> int:
+    return db.execute('register_editor', ed[:2]).lastrowid
+
+
+def register_reviewer(rev: List[str], db: Queries) -> int:
+    return db.execute('register_reviewer', rev[:2]).lastrowid
+
+
+def record_reviewer_expertise(id: int, i_codes: List[int], db: Queries) -> None:
+    db.insert_rows('import_reviewer_expertise', [(id, i_code) for i_code in i_codes])
+
+
+# rows per multi-row INSERT when importing
+IMPORT_CHUNK_SIZE = 1000
+
+
+def handle_import(args: List[str], db: Queries) -> List[int]:
+    """
+    Handle specific `import reviewers <csv> [<output csv>]` case input.
+    Each csv row is `fname,lname,ICode 1[,ICode 2[,ICode 3]]`; a header row is skipped.
+    Reviewers, their expertise and their login ids are inserted with one multi-row
+    INSERT per table per chunk. The generated login ids are returned and either
+    printed or written to the output csv alongside each reviewer's name.
+    """
+    if len(args) not in (2, 3) or args[0] != "reviewers":
+        report_failure("Invalid number of arguments.\n **Usage:** import reviewers <csv> [<output csv>]\n")
+        return []
+    if not file_exists_and_readable(args[1]):
+        return []
+
+    # opened before anything is inserted, so an unwritable path fails the import up front
     try:
-        query = "INSERT INTO `EDITOR` (`f_name`, `l_name`) VALUES ('{}','{}');".format(ed[0], ed[1])
-        # print("-->",query,"<--", end='')
-        cursor.execute(query)
-    except Error as err:
-        print(f"{err.msg}\n")
-    else:
-        return cursor.lastrowid
+        output_file = open(args[2], 'w', newline='') if len(args) == 3 else None
+    except OSError as err:
+        report_failure(f"Unable to write {args[2]}: {err.strerror}\n")
+        return []
+
+    output = []
+    with open(args[1], 'r', newline='') as file:
+        chunk = []
+        for lineno, row in enumerate(csv.reader(file), 1):
+            reviewer = parse_reviewer_row(row, lineno)
+            if reviewer:
+                chunk.append(reviewer)
+            if len(chunk) == IMPORT_CHUNK_SIZE:
+                output += import_reviewer_chunk(chunk, db)
+                chunk = []
+        if chunk:
+            output += import_reviewer_chunk(chunk, db)
+
+    login_ids = [login_id for login_id, _, _ in output]
+    print(f"Successfully imported {len(login_ids)} reviewers.\n")
+    if output_file:
+        try:
+            with output_file:
+                writer = csv.writer(output_file)
+                writer.writerow(['loginID', 'f_name', 'l_name'])
+                writer.writerows(output)
+        except OSError as err:
+            # the reviewers are already committed, so their login ids must not be lost
+            report_failure(f"Unable to write {args[2]}: {err.strerror}\n")
+            output_file = None
+        else:
+            print(f"Login ids written to {args[2]}\n")
+    if not output_file:
+        for login_id, f_name, l_name in output:
+            print(f"{f_name} {l_name}: `{login_id}`")
+        print()
+    return login_ids
+
+
+def parse_reviewer_row(row: List[str], lineno: int) -> Union[Tuple[str, str, List[int]], None]:
+    row = [field.strip() for field in row]
+    if not any(row):
+        return None
+    try:
+        i_codes = [int(i_code) for i_code in row[2:] if i_code]
+        if len(row) > 5 or not i_codes:
+            raise ValueError("expected fname,lname and 1 to 3 ICodes")
+        return row[0], row[1], i_codes
+    except ValueError as err:
+        # a header row is expected and silently skipped
+        if lineno > 1:
+            report_failure(f"Skipping line {lineno}: {err}")
 
 
-def register_reviewer(rev: List[str], cursor: MySQLConnection.cursor) -> Union[int, None]:
+def import_reviewer_chunk(chunk: List[Tuple[str, str, List[int]]], db: Queries) -> List[Tuple[int, str, str]]:
+    """
+    Insert one chunk of reviewers in three statements and commit it.
+    Return (login id, fname, lname) for each reviewer, or nothing if the chunk failed.
+    """
     try:
-        query = "INSERT INTO `REVIEWER` (`f_name`, `l_name`) VALUES ('{}','{}');".format(rev[0], rev[1])
-        # print("-->",query,"<--", end='')
-        cursor.execute(query)
+        with db.atomic():
+            first_reviewer_id = db.insert_rows('import_reviewers', [(f_name, l_name) for f_name, l_name, _ in chunk]).lastrowid
+            reviewer_ids = range(first_reviewer_id, first_reviewer_id + len(chunk))
+            expertise = [(reviewer_id, i_code) for reviewer_id, (_, _, i_codes) in zip(reviewer_ids, chunk) for i_code in i_codes]
+            db.insert_rows('import_reviewer_expertise', expertise)
+            first_login_id = db.insert_rows('import_logins', [(reviewer_id, 'reviewer') for reviewer_id in reviewer_ids]).lastrowid
     except Error as err:
-        print(f"{err.msg}\n")
-    else:
-        return cursor.lastrowid
+        report_failure(f"{err.msg}\n")
+        return []
 
-def record_reviewer_expertise(id: int, i_codes: List[int], cursor) -> None:
-    for i_code in i_codes:
-        try:
-            query = "INSERT INTO `REVIEWER_EXPERTISE` (`REVIEWER_reviewerID`, `ICODE_code`) VALUES ('{}','{}');".format(id, i_code)
-            # print("-->",query,"<--", end='')
-            cursor.execute(query)
-        except Error as err:
-            print(f"{err.msg}\n")
-        # else:
-        #     print(f"Successfully added reviewer expertise for ICode={i_code}.\n")
+    db.commit()
+    for reviewer_id, (_, _, i_codes) in zip(reviewer_ids, chunk):
+        REVIEWER_INDEX.add_reviewer(reviewer_id, i_codes)
+    return [(first_login_id + i, f_name, l_name) for i, (f_name, l_name, _) in enumerate(chunk)]
 
     
-def handle_login(args: List[str], conn: MySQLConnection) -> Tuple[int, str]:
+# rows read from the server at a time by streamed listings
+LISTING_PAGE_SIZE = 100
+
+
+def parse_listing_options(args: List[str]) -> Tuple[List[str], Union[int, None], int]:
+    """
+    Split the `--limit N` and `--page-size N` options of a listing command off `args`.
+    Return the remaining args, the row limit (None for all rows) and the page size.
+    Raise ValueError on a malformed option.
+    """
+    rest, limit, page_size = [], None, LISTING_PAGE_SIZE
+    args = iter(args)
+    for arg in args:
+        if arg in ('--limit', '--page-size'):
+            value = int(next(args, ''))
+            if value < 1:
+                raise ValueError(f"{arg} must be at least 1")
+            if arg == '--limit':
+                limit = value
+            else:
+                page_size = value
+        else:
+            rest.append(arg)
+    return rest, limit, page_size
+
+
+def handle_login(args: List[str], db: Queries, session: Session) -> None:
     """
-    Handle specific `login <id>` case input.
-    Open and close MySQLConnection.cursor appropriately.
+    Handle specific `login <id> [--limit N] [--page-size N]` case input.
+    Resolve the login id once and keep the identity and profile record on `session`.
     """
-    mycursor = conn.cursor(buffered=True)
+    try:
+        args, limit, page_size = parse_listing_options(args)
+    except ValueError:
+        args = []
     if len(args) != 1:
-        print("Invalid number of arguments.\n **Usage:** login <id>\n")
+        report_failure("Invalid number of arguments.\n **Usage:** login <id> [--limit N] [--page-size N]\n")
         return
-    
+
+    session.invalidate()
     login_id = int(args[0])
-    (role_id, role_type) = get_role_from_login(login_id, mycursor) or (None, None)
+    (role_id, role_type) = get_role_from_login(login_id, db) or (None, None)
 
     if not (role_id and role_type):
-        print("Invalid login id\n")
+        report_failure("Invalid login id\n")
         return
 
     login = getattr(sys.modules[__name__], f'login_{role_type}')
-    login(role_id, mycursor)
+    if role_type == 'reviewer':
+        profile = login(role_id, db, limit, page_size)
+    else:
+        profile = login(role_id, db)
 
-    return login_id, role_type
+    if profile:
+        session.login_id, session.role_id, session.role_type = login_id, role_id, role_type
+        session.profile = profile
 
     
 
-def login_author(role_id: int, cursor: MySQLConnection.cursor) -> None:
+def login_author(role_id: int, db: Queries) -> Union[Author, None]:
     """
     A description.
     """
     message = "Welcome author:"
     # authors full name, address, output from status commmand
     try:
-        query = "SELECT `f_name`, `l_name`, `email` FROM `PRIMARY_AUTHOR` WHERE `authorID` = {}".format(role_id)
-        cursor.execute(query)
+        author = cached_fetchone(db, ('profile', 'author', role_id), [('author', role_id)], Author, 'login_author', (role_id,))
     except Error as err:
-        print(f"{err.msg}\n")
+        report_failure(f"{err.msg}\n")
     else:
-        row = cursor.fetchone()
-        if row:
-            message = f"{message} {row[0]} {row[1]}, {row[2]}\n"
+        if author:
+            message = f"{message} {render(author)}\n"
             print(message)
+        return author
 
     
-def login_editor(role_id: int, cursor: MySQLConnection.cursor) -> None:
+def login_editor(role_id: int, db: Queries) -> Union[Editor, None]:
     """
     A description.
     """
     message = "Welcome editor:"
     # full name and output from status commeand
     try:
-        query = "SELECT `f_name`, `l_name` FROM `EDITOR` WHERE `editorID` = {}".format(role_id)
-        cursor.execute(query)
+        editor = cached_fetchone(db, ('profile', 'editor', role_id), [('editor', role_id)], Editor, 'login_editor', (role_id,))
     except Error as err:
-        print(f"{err.msg}\n")
+        report_failure(f"{err.msg}\n")
     else:
-        row = cursor.fetchone()
-        if row:
-            message = f"{message} {row[0]} {row[1]}\n"
+        if editor:
+            message = f"{message} {render(editor)}\n"
             print(message)
+        return editor
     
 
-def login_reviewer(role_id: int, cursor: MySQLConnection.cursor) -> None:
+def login_reviewer(role_id: int, db: Queries, limit: int = None, page_size: int = LISTING_PAGE_SIZE) -> Union[Reviewer, None]:
     """
     A description.
     """
@@ -232,253 +349,527 @@ def login_reviewer(role_id: int, cursor: MySQLConnection.cursor) -> None:
     # under review through accepted/rejected
     message = "Welcome reviewer:"
     try:
-        query = "SELECT `f_name`, `l_name` FROM `REVIEWER` WHERE `reviewerID` = {}".format(role_id)
-        cursor.execute(query)
+        profile = cached_fetchone(db, ('profile', 'reviewer', role_id), [('reviewer', role_id)], Reviewer, 'login_reviewer', (role_id,))
     except Error as err:
-        print(f"{err.msg}\n")
+        report_failure(f"{err.msg}\n")
+        return
     else:
-        row = cursor.fetchone()
-        if row:
-            message = f"{message} {row[0]} {row[1]}\n"
+        if profile:
+            message = f"{message} {render(profile)}\n"
             print(message)
             print("Your manuscripts: \n")
         else:
             return
 
+    # show ReviewStatus view for this reviewer, printing rows as they arrive
+    key = ('review_status', role_id, limit)
+    reviews = READ_CACHE.get(key)
     try:
-        cursor.execute(f"SET @rev_id = {role_id};")
+        if reviews is None:
+            db.execute('set_review_status_reviewer', (role_id,))
+            reviews = stream_into_cache(db, key, [('reviewer', role_id)], Review, lambda review: ('manuscript', review.get('manuscriptID')),
+                                        'review_status', (limit or NO_LIMIT,), page_size)
+        for review in reviews:
+            print(render(review))
     except Error as err:
-        print(f"{err.msg}\n")
+        report_failure(f"{err.msg}\n")
 
-    # show ReviewStatus view for this reviewer
-    try:
-        cursor.execute("SELECT * FROM `ReviewStatus`;")
-    except Error as err:
-        print(f"{err.msg}\n")
-    else:
-        rows = cursor.fetchall()
-        for row in rows:
-            print(row)
+    return profile
 
 
-def get_role_from_login(login_id: int, cursor: MySQLConnection.cursor) -> Tuple[Union[int, None], str]:
+def get_role_from_login(login_id: int, db: Queries) -> Tuple[Union[int, None], str]:
     try:
-        query = "SELECT `roleID`, `role_type` FROM `LOGIN_TO_ROLE` WHERE `loginID` = {};".format(login_id)
-        cursor.execute(query)
+        login = cached_fetchone(db, ('login', login_id), [('login', login_id)], LoginRole, 'get_role_from_login', (login_id,))
     except Error as err:
-        print(f"{err.msg}\n")
+        report_failure(f"{err.msg}\n")
     else:
-        row = cursor.fetchone()
-        if row:
-            return row[0], row[1]
+        if login:
+            return login.role_id, login.role_type
 
     
-def handle_resign(conn: MySQLConnection, curr_login_id: int, curr_role: str, arg: str) -> bool:
-    mycursor = conn.cursor(buffered=True)
-
+def handle_resign(db: Queries, session: Session, arg: str) -> bool:
     if arg:
-        print("Invalid number of arguments.\n **Usage:** resign \n")
-    elif curr_role != 'reviewer' or not curr_login_id:
-        print("Invalid command. Only able to `resign` if logged in as a reviewer\n")
+        report_failure("Invalid number of arguments.\n **Usage:** resign \n")
+    elif not session.is_role('reviewer'):
+        report_failure("Invalid command. Only able to `resign` if logged in as a reviewer\n")
     else:
-        role_id = get_role_from_login(curr_login_id, mycursor)[0]
-        try:
-            query = f"DELETE FROM `REVIEWER_EXPERTISE` WHERE `REVIEWER_reviewerID` = {role_id};"
-            mycursor.execute(query)
-        except Error as err:
-            print(f"{err.msg}\n")
-
+        role_id = session.role_id
+        # all three deletes succeed together or none of them take effect
         try:
-            query = f"DELETE FROM `LOGIN_TO_ROLE` WHERE `roleID` = {role_id};"
-            mycursor.execute(query)
+            with db.atomic():
+                db.execute('resign_expertise', (role_id,))
+                db.execute('resign_login', (role_id,))
+                db.execute('resign_reviewer', (role_id,))
         except Error as err:
-            print(f"{err.msg}\n")
-
-        try:
-            query = f"DELETE FROM `REVIEWER` WHERE `reviewerID` = {role_id};"
-            mycursor.execute(query)
-        except Error as err:
-            print(f"{err.msg}\n")
+            report_failure(f"{err.msg}\n")
         else:
             print("You have been removed. Thank you for your service.\n")
-            conn.commit()
-            mycursor.close()
+            db.commit()
+            REVIEWER_INDEX.remove_reviewer(role_id)
+            READ_CACHE.invalidate_tag(('login', session.login_id), ('reviewer', role_id))
+            session.invalidate()
             return True
     
     return False
 
-def handle_accept(conn: MySQLConnection, curr_login_id: int, curr_role: str, args: List[str]):
-    mycursor = conn.cursor(buffered=True)
+def handle_accept(db: Queries, session: Session, args: List[str]):
     # Any attempts to act on a manuscript not assigned to this reviewer or 
     # a manuscript not in “Reviewing” status should fail with an appropriate message.
 
     # verify user is logged in and is a reviewer
-    if curr_role != 'reviewer' or not curr_login_id:
-        print("Invalid command. Only able to use `accept` if logged in as a reviewer\n")
+    if not session.is_role('reviewer'):
+        report_failure("Invalid command. Only able to use `accept` if logged in as a reviewer\n")
     elif len(args) != 5:
-        print("Invalid number of arguments.\n **Usage:** accept <manuscriptID> <ascore> <cscore> <mscore> <escore>\n")
+        report_failure("Invalid number of arguments.\n **Usage:** accept <manuscriptID> <ascore> <cscore> <mscore> <escore>\n")
     else:
         manID = int(args[0])
-        reviewer_id = get_role_from_login(curr_login_id, mycursor)[0]
-        
-        if check_man_for_reviewer(manID, reviewer_id, mycursor):
-            ascore, cscore, mscore, escore = int(args[1]), int(args[2]), int(args[3]), int(args[4])
-            # check that scores are between 1 and 10?
-            give_feedback(manID, reviewer_id, mycursor, ascore, cscore, mscore, escore, 10)
+        ascore, cscore, mscore, escore = int(args[1]), int(args[2]), int(args[3]), int(args[4])
+        # check that scores are between 1 and 10?
+        give_feedback(manID, session.role_id, db, ascore, cscore, mscore, escore, 10)
         
-    conn.commit()
-    mycursor.close()
+    db.commit()
 
-def handle_reject(conn: MySQLConnection, curr_login_id: int, curr_role: str, args: List[str]):
-    mycursor = conn.cursor(buffered=True)
+def handle_reject(db: Queries, session: Session, args: List[str]):
     # Any attempts to act on a manuscript not assigned to this reviewer or 
     # a manuscript not in “Reviewing” status should fail with an appropriate message.
 
     # verify user is logged in and is a reviewer
-    if curr_role != 'reviewer' or not curr_login_id:
-        print("Invalid command. Only able to use `reject` if logged in as a reviewer\n")
+    if not session.is_role('reviewer'):
+        report_failure("Invalid command. Only able to use `reject` if logged in as a reviewer\n")
     elif len(args) != 5:
-        print("Invalid number of arguments.\n **Usage:** reject <manuscriptID> <ascore> <cscore> <mscore> <escore>\n")
+        report_failure("Invalid number of arguments.\n **Usage:** reject <manuscriptID> <ascore> <cscore> <mscore> <escore>\n")
     else:
         manID = int(args[0])
-        reviewer_id = get_role_from_login(curr_login_id, mycursor)[0]
+        ascore, cscore, mscore, escore = int(args[1]), int(args[2]), int(args[3]), int(args[4])
+        # check that scores are between 1 and 10?
+        give_feedback(manID, session.role_id, db, ascore, cscore, mscore, escore, 0)
         
-        if check_man_for_reviewer(manID, reviewer_id, mycursor):
-            ascore, cscore, mscore, escore = int(args[1]), int(args[2]), int(args[3]), int(args[4])
-            # check that scores are between 1 and 10?
-            give_feedback(manID, reviewer_id, mycursor, ascore, cscore, mscore, escore, 0)
-        
-    conn.commit()
-    mycursor.close()
+    db.commit()
     
 
-def give_feedback(manuscriptID: int, reviewerID: int, cursor: MySQLConnection.cursor, ascore: int, cscore: int, mscore:int, escore:int, rec_score:int):
-    try:
-        query = f"UPDATE `REVIEW` SET `score_a`={ascore}, `score_c`={cscore}, `score_m`={mscore}, `score_e`={escore}, `rec_score`={rec_score}, `date_feedback_received` = now() WHERE `MANUSCRIPT_manuscriptID`={manuscriptID} AND `REVIEWER_reviewerID`={reviewerID};"
-        cursor.execute(query)
-    except Error as err:
-        print(f"{err.msg}\n")
-    else:
-        print("Scores successfully submitted")
+# manuscripts per validation query and per CASE UPDATE in `review --file`
+REVIEW_CHUNK_SIZE = 1000
 
 
-def check_man_for_reviewer(manuscriptID: int, reviewerID: int, cursor: MySQLConnection.cursor) -> bool:
-    # verify that manuscript is assigned to reviewer
-    # AND that manuscript status is under review
-    
-    # check that manuscript status is UnderReview
+def handle_review(db: Queries, session: Session, args: List[str]) -> int:
+    """
+    Handle specific `review --file <csv>` case input.
+    Each csv row is `manuscriptID,accept|reject,ascore,cscore,mscore,escore`; a header row is skipped.
+    Every manuscript is checked against MANUSCRIPT and REVIEW with one set-based query
+    per chunk, the scores are written with one CASE UPDATE per chunk, and the whole
+    file is committed once. Rows that fail a check are reported and left out.
+    Return the number of reviews recorded.
+    """
+    if not session.is_role('reviewer'):
+        report_failure("Invalid command. Only able to use `review` if logged in as a reviewer\n")
+        return 0
+    if len(args) != 2 or args[0] != '--file':
+        report_failure("Invalid number of arguments.\n **Usage:** review --file <csv>\n")
+        return 0
+    if not os.path.isfile(args[1]) or not os.access(args[1], os.R_OK):
+        report_failure("Scores file either doesn't exist or is not readable.\n")
+        return 0
+
+    reviewer_id = session.role_id
+    scores: Dict[int, Tuple[int, ...]] = {}
+    lines: Dict[int, int] = {}
+    rejected: List[Tuple[int, str]] = []
+    with open(args[1], 'r', newline='') as file:
+        for lineno, row in enumerate(csv.reader(file), 1):
+            row = [field.strip() for field in row]
+            if not any(row):
+                continue
+            try:
+                if len(row) != 6 or row[1].lower() not in ('accept', 'reject'):
+                    raise ValueError
+                manID = int(row[0])
+                values = tuple(int(score) for score in row[2:]) + (10 if row[1].lower() == 'accept' else 0,)
+            except ValueError:
+                # a header row is expected and silently skipped
+                if lineno > 1:
+                    rejected.append((lineno, "expected manuscriptID,accept|reject,ascore,cscore,mscore,escore"))
+                continue
+            if manID in scores:
+                rejected.append((lineno, f"manuscript {manID} already reviewed on line {lines[manID]}"))
+                continue
+            scores[manID], lines[manID] = values, lineno
+
+    accepted, completed = [], []
     try:
-        query = f"SELECT `status` FROM `MANUSCRIPT` WHERE `manuscriptID`={manuscriptID};"
-        cursor.execute(query)
+        with db.atomic():
+            ids = list(scores)
+            for i in range(0, len(ids), REVIEW_CHUNK_SIZE):
+                chunk = ids[i:i + REVIEW_CHUNK_SIZE]
+                found = {manID: (status, assigned, is_open) for manID, status, assigned, is_open
+                         in db.fetchall_sized('review_targets', len(chunk), [reviewer_id] + chunk)}
+                valid = []
+                for manID in chunk:
+                    status, assigned, is_open = found.get(manID, (None, None, None))
+                    if status is None:
+                        rejected.append((lines[manID], f"invalid manuscriptID {manID}"))
+                    elif status != "UnderReview":
+                        rejected.append((lines[manID], f"manuscript {manID} is not `UnderReview`"))
+                    elif not assigned:
+                        rejected.append((lines[manID], f"manuscript {manID} is not assigned to you"))
+                    else:
+                        valid.append(manID)
+                if valid:
+                    params = [param for column in range(len(SCORE_COLUMNS)) for manID in valid for param in (manID, scores[manID][column])]
+                    cursor = db.execute_sized('give_feedback_many', len(valid), params + [reviewer_id] + valid + valid)
+                    if cursor.rowcount < len(valid):
+                        # the UPDATE re-checks the status, so a manuscript that left UnderReview
+                        # since the query above was skipped; find which ones to report them
+                        valid = review_targets_still_valid(valid, reviewer_id, lines, rejected, db)
+                    accepted += valid
+                    completed += [manID for manID in valid if found[manID][2]]
     except Error as err:
-        print(f"{err.msg}\n")
-    else:
-        row = cursor.fetchone()
-        # if no row found with that manID, invalid ID
-        if not row:
-            print("Invalid manuscriptID")
-            return False
-        if row[0] != "UnderReview":
-            print("Error: this manuscript is not `UnderReview`")
-            return False
+        report_failure(f"{err.msg}\n")
+        return 0
+
+    db.commit()
+    # re-scored reviews were already done and do not change the reviewer's load
+    for manID in completed:
+        REVIEWER_INDEX.review_completed(reviewer_id)
+    READ_CACHE.invalidate_tag(('reviewer', reviewer_id), *[('manuscript', manID) for manID in accepted])
+    for lineno, reason in sorted(rejected):
+        report_failure(f"Rejected line {lineno}: {reason}")
+    print(f"Scores submitted for {len(accepted)} manuscripts; {len(rejected)} rows rejected.\n")
+    return len(accepted)
+
+
+def review_targets_still_valid(manuscript_ids: List[int], reviewer_id: int, lines: Dict[int, int],
+                                rejected: List[Tuple[int, str]], db: Queries) -> List[int]:
+    """Return the manuscripts still UnderReview and assigned to the reviewer; add the rest to `rejected`."""
+    found = {manID: (status, assigned) for manID, status, assigned, _
+             in db.fetchall_sized('review_targets', len(manuscript_ids), [reviewer_id] + manuscript_ids)}
+    valid = []
+    for manID in manuscript_ids:
+        status, assigned = found.get(manID, (None, None))
+        if status == "UnderReview" and assigned:
+            valid.append(manID)
+        else:
+            rejected.append((lines[manID], f"manuscript {manID} is no longer `UnderReview`"))
+    return valid
 
-    # check that given manuscript is assigned to this reviewer
+
+def give_feedback(manuscriptID: int, reviewerID: int, db: Queries, ascore: int, cscore: int, mscore:int, escore:int, rec_score:int):
+    # the UPDATE itself only matches a manuscript that is UnderReview and assigned to
+    # this reviewer, so the checks and the write are one round trip with no race between them
+    params = (ascore, cscore, mscore, escore, rec_score, manuscriptID, reviewerID, manuscriptID)
     try:
-        query = f"SELECT * FROM `REVIEW` WHERE `MANUSCRIPT_manuscriptID`={manuscriptID} AND `REVIEWER_reviewerID`={reviewerID};"
-        cursor.execute(query)
+        completed = db.execute('give_feedback', params).rowcount > 0
+        # not an open review: either one already scored, whose scores are replaced, or an invalid one
+        if not completed and db.execute('revise_feedback', params).rowcount < 1 \
+                and not check_man_for_reviewer(manuscriptID, reviewerID, db):
+            return
     except Error as err:
-        print(f"{err.msg}\n")
+        report_failure(f"{err.msg}\n")
     else:
-        row = cursor.fetchone()
-        # if no row found with both manID and reviewerID, not assigned to this reviewer
-        if not row:
-            print("Error: this manuscript is not assigned to you")
-        else:
-            return True
-
-    return False
-
-
-    
+        # only a review going from open to done lowers the reviewer's load
+        if completed:
+            REVIEWER_INDEX.review_completed(reviewerID)
+        READ_CACHE.invalidate_tag(('reviewer', reviewerID), ('manuscript', manuscriptID))
+        print("Scores successfully submitted")
 
-def handle_submit(conn: MySQLConnection, curr_login_id: int, curr_role: str, args: List[str]):
-    mycursor = conn.cursor(buffered=True)
 
-    if curr_role != 'author' or not curr_login_id:
-        print("Invalid command. Only able to `submit` if logged in as an author\n")
+def check_man_for_reviewer(manuscriptID: int, reviewerID: int, db: Queries) -> bool:
+    """
+    Explain why neither `give_feedback` nor `revise_feedback` matched a row: print the reason and return False,
+    or return True if the review is valid after all (the scores were re-submitted unchanged).
+    """
+    row = db.fetchone('review_target', (reviewerID, manuscriptID))
+    # if no row found with that manID, invalid ID
+    if not row:
+        report_failure("Invalid manuscriptID")
+        return False
+    status, assigned = row
+    if status != "UnderReview":
+        report_failure("Error: this manuscript is not `UnderReview`")
+        return False
+    # if no REVIEW row with both manID and reviewerID, not assigned to this reviewer
+    if not assigned:
+        report_failure("Error: this manuscript is not assigned to you")
+        return False
+    return True
+
+
+def handle_submit(db: Queries, session: Session, args: List[str]) -> Union[int, None]:
+    """
+    Handle specific `submit <title> <Affiliation> <ICode> [<author2> ...] <filename>` case input.
+    Return the new manuscript id, if the submission succeeded.
+    """
+    manuscript_id = None
+    if not session.is_role('author'):
+        report_failure("Invalid command. Only able to `submit` if logged in as an author\n")
     elif len(args) < 4 or len(args) > 7:
-        print(
+        report_failure(
             "Invalid number of arguments.\n **Usage:** submit <title> <Affiliation> <ICode> <author2> <author3> <author4> <filename>\n"
         )
     else:
-        role_id = get_role_from_login(curr_login_id, mycursor)[0]
-        title, affiliation, icode, filename = args[0], args[1], args[2], args[-1]
+        role_id = session.role_id
+        title, affiliation, icode, filename = args[0], args[1], int(args[2]), args[-1]
         if not file_exists_and_readable(filename):
             return
-        with open(filename, 'r') as file:
-            document = file.read()
+        secondary_authors = args[3:-1]
+        # the manuscript and its secondary authors are stored together or not at all
         try:
-            query = "INSERT INTO `MANUSCRIPT` (`title`, `document`, `status`, `PRIMARY_AUTHOR_authorID`, `ICODE_code`) VALUES ('{}','{}','{}','{}','{}');".format(title, document, 'submitted', role_id, int(icode))
-            mycursor.execute(query)
+            new_id = GROUP_COMMIT.run(db, lambda db: write_submission(role_id, title, icode, filename, secondary_authors, db))
         except Error as err:
-            print(f"{err.msg}\n")
+            report_failure(f"{err.msg}\n")
         else:
             # Success
-            manuscript_id = mycursor.lastrowid
+            READ_CACHE.invalidate_tag(('author', role_id))
+            manuscript_id = new_id
             print(f"Manuscript submission confirmed.\nSystem-wide unique manuscript id: {manuscript_id}")
 
-            num_secondary_authors = len(args) - 4
-            for i in range(num_secondary_authors):
-                try:
-                    query = "INSERT INTO `SECONDARY_AUTHOR` (`priority`, `MANUSCRIPT_manuscriptID`, `full_name`) VALUES ('{}','{}','{}');".format(i+1, manuscript_id, args[len(args)-1-(num_secondary_authors-i)])
-                    mycursor.execute(query)
-                except Error as err:
-                    print(f"{err.msg}\n")
-    
-    conn.commit()
-    mycursor.close()
+    return manuscript_id
+
+
+def write_submission(author_id: int, title: str, icode: int, filename: str, secondary_authors: List[str], db: Queries) -> int:
+    """Insert the manuscript and its secondary authors; return the manuscript id."""
+    # an open binary file is streamed to the server in chunks as long data,
+    # so the manuscript is never held in memory whatever its size or encoding
+    with open(filename, 'rb') as document:
+        cursor = db.execute('submit_manuscript', (title, document, 'submitted', author_id, icode))
+    manuscript_id = cursor.lastrowid
+    if secondary_authors:
+        db.insert_rows('add_secondary_authors', [
+            (priority, manuscript_id, full_name) for priority, full_name in enumerate(secondary_authors, 1)
+        ])
+    return manuscript_id
+
+
+# reviewers assigned by `assign <manuscriptID>` when no count is given
+DEFAULT_REVIEWERS_PER_MANUSCRIPT = 3
+
+
+def handle_assign(db: Queries, session: Session, args: List[str]) -> List[int]:
+    """
+    Handle specific `assign <manuscriptID> [n]` case input.
+    Assign the `n` least-loaded reviewers whose expertise matches the manuscript's
+    ICode, chosen from the in-memory REVIEWER_INDEX rather than by scanning
+    REVIEWER_EXPERTISE and REVIEW, and move a submitted manuscript to UnderReview.
+    Return the assigned reviewer ids.
+    """
+    if not session.is_role('editor'):
+        report_failure("Invalid command. Only able to `assign` if logged in as an editor\n")
+        return []
+    try:
+        if len(args) not in (1, 2):
+            raise ValueError
+        manID = int(args[0])
+        n = int(args[1]) if len(args) == 2 else DEFAULT_REVIEWERS_PER_MANUSCRIPT
+        if n < 1:
+            raise ValueError
+    except ValueError:
+        report_failure("Invalid arguments.\n **Usage:** assign <manuscriptID> [n], with n at least 1\n")
+        return []
+    try:
+        row = db.fetchone('manuscript_icode', (manID,))
+        if not row:
+            report_failure("Invalid manuscriptID")
+            return []
+        i_code, status = row
+        if status not in ('submitted', 'UnderReview'):
+            report_failure(f"Error: cannot assign reviewers to a manuscript with status `{status}`")
+            return []
+
+        REVIEWER_INDEX.ensure_loaded(db)
+        already_assigned = [reviewer_id for (reviewer_id,) in db.fetchall('manuscript_reviewers', (manID,))]
+        reviewer_ids = REVIEWER_INDEX.least_loaded(i_code, n, exclude=already_assigned)
+        if not reviewer_ids:
+            report_failure(f"No unassigned reviewers with expertise in ICode {i_code}\n")
+            return []
+
+        with db.atomic():
+            db.insert_rows('assign_reviews', [(manID, reviewer_id) for reviewer_id in reviewer_ids])
+            db.execute('start_review', (manID,))
+    except Error as err:
+        report_failure(f"{err.msg}\n")
+        return []
+
+    db.commit()
+    READ_CACHE.invalidate_tag(('manuscript', manID), *[('reviewer', reviewer_id) for reviewer_id in reviewer_ids])
+    for reviewer_id in reviewer_ids:
+        REVIEWER_INDEX.review_assigned(reviewer_id)
+    if len(reviewer_ids) < n:
+        print(f"Only {len(reviewer_ids)} matching reviewers were available.")
+    print(f"Manuscript{manID} assigned to reviewers: {', '.join(map(str, reviewer_ids))}\n")
+    return reviewer_ids
 
 
 def file_exists_and_readable(filename: str) -> bool:
     if os.path.isfile(filename) and os.access(filename, os.R_OK):
         return True
-    print("Manuscript filename either doesn't exist or is not readable.\n")
+    report_failure("Manuscript filename either doesn't exist or is not readable.\n")
     return False
 
 
-def handle_status(conn: MySQLConnection, curr_login_id: int, curr_role: str, arg: str) -> bool:
-    mycursor = conn.cursor(buffered=True)
-    
-    if not (curr_login_id and curr_role):
-        print("Invalid command. Must be logged in as an author or editor to view `status`\n")
-    elif arg:
-        print("Invalid number of arguments.\n **Usage:** status \n")
-    elif curr_role == 'author':
-        author_id = get_role_from_login(curr_login_id, mycursor)[0]
-        get_author_status(mycursor, author_id)
-    elif curr_role == 'editor':
-        editor_id = get_role_from_login(curr_login_id, mycursor)[0]
-        get_editor_status(mycursor, editor_id)
+def handle_status(db: Queries, session: Session, args: List[str]) -> None:
+    try:
+        args, limit, page_size = parse_listing_options(args)
+    except ValueError:
+        args = [None]
+
+    if not session.login_id:
+        report_failure("Invalid command. Must be logged in as an author or editor to view `status`\n")
+    elif args:
+        report_failure("Invalid number of arguments.\n **Usage:** status [--limit N] [--page-size N]\n")
+    elif session.role_type == 'author':
+        get_author_status(db, session.role_id, limit, page_size)
+    elif session.role_type == 'editor':
+        get_editor_status(db, session.role_id, limit, page_size)
     else:
-        print("Invalid command. Only able to see `status` if logged in as an author or editor\n")
-    
-    mycursor.close()
+        report_failure("Invalid command. Only able to see `status` if logged in as an author or editor\n")
 
 
-def get_author_status(cursor: MySQLConnection.cursor, author_id: int) -> None:
+def get_author_status(db: Queries, author_id: int, limit: int = None, page_size: int = LISTING_PAGE_SIZE) -> None:
+    key = ('author_status', author_id, limit)
+    manuscripts = READ_CACHE.get(key)
+    if manuscripts is None:
+        manuscripts = stream_into_cache(db, key, [('author', author_id)], Manuscript, lambda manuscript: ('manuscript', manuscript.manuscript_id),
+                                        'author_status', (author_id, limit or NO_LIMIT), page_size)
     try:
-        query = f"SELECT `manuscriptID`, `title`, `date_received`, `status`, `status_updated_at` FROM `MANUSCRIPT` WHERE `PRIMARY_AUTHOR_authorID`={author_id};"
-        cursor.execute(query)
+        for manuscript in manuscripts:
+            print(render(manuscript) + "\n")
     except Error as err:
-        print(f"{err.msg}\n")
-    else:
-        rows = cursor.fetchall()
-        for i, row in enumerate(rows):
-            print(f"Manuscript{row[0]} -- Title: '{row[1]}';  Date received: '{row[2]}';  Current status: '{row[3]}';  Status last updated at: '{row[4]}'\n")
+        report_failure(f"{err.msg}\n")
+
+
+def get_editor_status(db: Queries, editor_id: int, limit: int = None, page_size: int = LISTING_PAGE_SIZE) -> None:
+    """
+    Print every manuscript with its status, reviewer count, reviews received and
+    average scores. Each page is one grouped query that resumes after the last
+    manuscriptID seen, so only a page of rows is ever held in memory.
+    """
+    last_id, total = 0, 0
+    remaining = limit or NO_LIMIT
+    while remaining:
+        try:
+            rows = db.fetchall('editor_status_page', (last_id, min(page_size, remaining)))
+        except Error as err:
+            report_failure(f"{err.msg}\n")
+            return
+        for row in rows:
+            averages = "/".join("-" if score is None else f"{score:.1f}" for score in row[5:9])
+            print(f"Manuscript{row[0]} -- Title: '{row[1]}';  Current status: '{row[2]}';  "
+                  f"Reviewers: {row[3]};  Reviews received: {row[4]};  Average scores (A/C/M/E): {averages}\n")
+        total += len(rows)
+        remaining -= len(rows)
+        if len(rows) < page_size:
+            break
+        last_id = rows[-1][0]
+
+    if not total:
+        print("No manuscripts have been submitted.\n")
+
 
+# rows read from the server at a time by `export`
+EXPORT_PAGE_SIZE = 1000
 
-def get_editor_status(cursor: MySQLConnection.cursor, editor_id: int) -> None:
-    pass
+
+def handle_export(db: Queries, session: Session, args: List[str]) -> int:
+    """
+    Handle specific `export <table|view> <file> [--format csv|jsonl]` case input.
+    Rows are streamed off an unbuffered cursor a page at a time and written as they
+    arrive, so memory use does not grow with the table. A file name ending in `.gz`
+    is gzip-compressed. Tables are open to editors; the ReviewStatus view exports the
+    logged-in reviewer's manuscripts. Return the number of rows written.
+    """
+    fmt = 'csv'
+    if len(args) == 4 and args[2] == '--format':
+        fmt = args[3]
+        args = args[:2]
+    if len(args) != 2 or fmt not in ('csv', 'jsonl'):
+        report_failure("Invalid number of arguments.\n **Usage:** export <table|view> <file> [--format csv|jsonl]\n")
+        return 0
+    source = next((source for source in EXPORT_SOURCES if source.lower() == args[0].lower()), None)
+    if source is None:
+        report_failure(f"Unknown table or view. Choose from: {', '.join(EXPORT_SOURCES)}\n")
+        return 0
+    if source == 'ReviewStatus' and not session.is_role('reviewer'):
+        report_failure("Invalid command. Only able to export ReviewStatus if logged in as a reviewer\n")
+        return 0
+    if source != 'ReviewStatus' and not session.is_role('editor'):
+        report_failure("Invalid command. Only able to `export` tables if logged in as an editor\n")
+        return 0
+
+    path = args[1]
+    opener = gzip.open if path.endswith('.gz') else open
+    name = f'export_{source}'
+    count = 0
+    start = time.perf_counter()
+    try:
+        with opener(path, 'wt', newline='') as file:
+            if source == 'ReviewStatus':
+                db.execute('set_review_status_reviewer', (session.role_id,))
+            rows = db.stream(name, (), EXPORT_PAGE_SIZE)
+            first = next(rows, None)
+            columns = db.columns(name)
+            writer = csv.writer(file) if fmt == 'csv' else None
+            if writer:
+                writer.writerow(columns)
+            for row in itertools.chain([first] if first is not None else [], rows):
+                values = [export_value(value) for value in row]
+                if writer:
+                    writer.writerow(values)
+                else:
+                    file.write(json.dumps(dict(zip(columns, values))) + '\n')
+                count += 1
+    except OSError as err:
+        report_failure(f"Unable to write {path}: {err.strerror}\n")
+        return 0
+
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else float('inf')
+    print(f"Exported {count} rows from {source} to {path} in {elapsed:.2f}s ({rate:.0f} rows/s)\n")
+    return count
+
+
+def export_value(value: object) -> object:
+    """Make a column value representable in csv and JSON (BLOBs as base64, times and decimals as text)."""
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode('ascii')
+    if isinstance(value, (datetime.date, datetime.time, datetime.timedelta, decimal.Decimal)):
+        return str(value)
+    return value
+
+
+def handle_advise(db: Queries, args: List[str]) -> int:
+    """
+    Handle specific `advise [<migration file>]` case input.
+    EXPLAIN every statement template the handlers use, print which ones scan a whole
+    table, and print (or write to the file) a migration creating the missing indexes.
+    Return the number of indexes proposed.
+    """
+    if len(args) > 1:
+        report_failure("Invalid number of arguments.\n **Usage:** advise [<migration file>]\n")
+        return 0
+    try:
+        plans, wanted = advise(db)
+    except Error as err:
+        report_failure(f"{err.msg}\n")
+        return 0
+
+    print("Statement plans (SCAN: full table scan; scan*: expected):")
+    print("\n".join(plan_report(plans)) + "\n")
+    count = sum(len(indexes) for indexes in wanted.values())
+    if not count:
+        print("Every lookup is served by an index.\n")
+        return 0
+    script = migration_script(wanted, db.dialect)
+    if args:
+        try:
+            with open(args[0], 'w') as file:
+                file.write(script)
+        except OSError as err:
+            report_failure(f"Unable to write {args[0]}: {err.strerror}\n")
+            print(script)
+            return count
+        print(f"{count} indexes proposed; migration written to {args[0]}\n")
+    else:
+        print(script)
+    return count
 
 
 class JournalApp(cmd.Cmd):
@@ -486,47 +877,194 @@ class JournalApp(cmd.Cmd):
     prompt = '>>> '
     # file = None
 
-    print("Attempting to connect to db...\n")
-    conn = connect_to_db()
-    while not conn:
-        conn = connect_to_db()
+    def __init__(self, *args, pool: ConnectionPool = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # connections are opened lazily by the first command that needs one;
+        # a pool passed in is shared with other sessions and left open on exit
+        self.owns_pool = pool is None
+        self.pool = pool or ConnectionPool()
+        # current logged-in info
+        self.session = Session()
+        # set while `run_batch` holds one connection across many commands
+        self.batch_db: Queries = None
+        self.last_failed = False
+
+    @contextmanager
+    def connection(self) -> Iterator[Queries]:
+        if self.batch_db is not None:
+            yield self.batch_db
+        else:
+            # nothing is checked out until a handler runs its first statement
+            with self.pool.connection(lazy=True) as db:
+                yield db
+
+    def onecmd(self, line: str) -> bool:
+        self.last_failed = _outcome.failed = False
+        command = self.parseline(line)[0] or ''
+        try:
+            if command in ('stats', 'help') or not hasattr(self, f'do_{command}'):
+                return super().onecmd(line)
+            with STATS.command(command):
+                return super().onecmd(line)
+        except Error as err:
+            report_failure(f"{err.msg}\n")
+            return False
+        finally:
+            self.last_failed = self.last_failed or _outcome.failed
 
-    # current logged-in info
-    curr_login_id: int = None
-    curr_role: Literal['author', 'editor', 'reviewer'] = None
+    def default(self, line: str) -> None:
+        self.last_failed = True
+        super().default(line)
     
     # --- basic commands ---
     def do_register(self, arg: str) -> None:
         args = shlex.split(arg)
-        handle_register(args, self.conn)
+        with self.connection() as db:
+            handle_register(args, db)
+
+    def do_import(self, arg: str) -> None:
+        args = shlex.split(arg)
+        with self.connection() as db:
+            handle_import(args, db)
 
     def do_login(self, arg: str) -> None:
         args = shlex.split(arg)
-        (self.curr_login_id, self.curr_role) = handle_login(args, self.conn) or (None, None)        
+        with self.connection() as db:
+            handle_login(args, db, self.session)
+
+    def do_logout(self, arg: str) -> None:
+        self.session.invalidate()
+        print("Logged out.\n")
     
     def do_resign(self, arg: str) -> None:
-        resigned = handle_resign(self.conn, self.curr_login_id, self.curr_role, arg)
-        if resigned:
-            self.curr_login_id, self.curr_role = None, None
+        with self.connection() as db:
+            handle_resign(db, self.session, arg)
+    
+    def do_accept(self, arg: str) -> None:
+        args = shlex.split(arg)
+        with self.connection() as db:
+            handle_accept(db, self.session, args)
     
     def do_reject(self, arg: str) -> None:
         args = shlex.split(arg)
-        handle_reject(self.conn, self.curr_login_id, self.curr_role, args)
+        with self.connection() as db:
+            handle_reject(db, self.session, args)
+    
+    def do_review(self, arg: str) -> None:
+        args = shlex.split(arg)
+        with self.connection() as db:
+            handle_review(db, self.session, args)
+    
+    def do_assign(self, arg: str) -> None:
+        args = shlex.split(arg)
+        with self.connection() as db:
+            handle_assign(db, self.session, args)
     
     def do_submit(self, arg: str) -> None:
         args = shlex.split(arg)
-        handle_submit(self.conn, self.curr_login_id, self.curr_role, args)
+        with self.connection() as db:
+            handle_submit(db, self.session, args)
+    
+    def do_export(self, arg: str) -> None:
+        args = shlex.split(arg)
+        with self.connection() as db:
+            handle_export(db, self.session, args)
     
     def do_status(self, arg: str) -> None:
-        handle_status(self.conn, self.curr_login_id, self.curr_role, arg)
+        args = shlex.split(arg)
+        with self.connection() as db:
+            handle_status(db, self.session, args)
+        
+    def do_advise(self, arg: str) -> None:
+        """advise [<migration file>]: EXPLAIN every statement, flag full scans and propose indexes."""
+        args = shlex.split(arg)
+        with self.connection() as db:
+            handle_advise(db, args)
+
+    def do_stats(self, arg: str) -> None:
+        """stats [reset]: statement counts and latencies per command and per statement."""
+        if arg.strip() == 'reset':
+            STATS.reset()
+            READ_CACHE.reset_counters()
+            print("Statistics reset.\n")
+        elif arg:
+            report_failure("Invalid argument.\n **Usage:** stats [reset]\n")
+        else:
+            print("\n".join(STATS.report() + READ_CACHE.report() + GROUP_COMMIT.report()) + "\n")
         
     def do_exit(self, arg: str) -> bool:
         print("Shutting down...")
-        self.conn.cmd_reset_connection()
-        self.conn.close()
+        # commit anything other sessions still have queued before connections close
+        GROUP_COMMIT.drain()
+        if self.owns_pool:
+            self.pool.close()
         return True
 
 
 
+def run_batch(app: JournalApp, lines: Iterable[str], commit_every: int) -> int:
+    """
+    Run journal commands from `lines` through `app` on a single connection,
+    committing once per `commit_every` commands instead of once per command.
+    Report each command's outcome and the overall throughput; return the failure count.
+    """
+    succeeded = failed = pending = 0
+    start = time.perf_counter()
+    with app.pool.connection() as db:
+        app.batch_db, db.defer_commits = db, True
+        try:
+            for lineno, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                try:
+                    stop = app.onecmd(line)
+                    ok = not app.last_failed
+                except Exception as err:
+                    stop, ok = False, False
+                    print(f"{err}\n")
+                if ok:
+                    succeeded += 1
+                else:
+                    failed += 1
+                print(f"[{lineno}] {'ok' if ok else 'FAILED'}: {line}")
+
+                pending += 1
+                if pending >= commit_every:
+                    db.flush()
+                    pending = 0
+                if stop:
+                    break
+            db.flush()
+        finally:
+            app.batch_db, db.defer_commits = None, False
+
+    elapsed = time.perf_counter() - start
+    total = succeeded + failed
+    rate = total / elapsed if elapsed else float('inf')
+    print(f"\nBatch finished: {total} commands, {succeeded} succeeded, {failed} failed "
+          f"in {elapsed:.2f}s ({rate:.1f} commands/s)")
+    return failed
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Journal DB Manager")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="run the journal commands in FILE ('-' for stdin) instead of the interactive shell")
+    parser.add_argument('--commit-every', type=int, default=100, metavar='N',
+                        help="in batch mode, commit once every N commands (default: 100)")
+    args = parser.parse_args(argv)
+    if args.commit_every < 1:
+        parser.error("--commit-every must be at least 1")
+    return args
+
+
 if __name__ == '__main__':
-    JournalApp().cmdloop()
+    args = parse_args()
+    if args.batch is None:
+        JournalApp().cmdloop()
+    elif args.batch == '-':
+        sys.exit(1 if run_batch(JournalApp(), sys.stdin, args.commit_every) else 0)
+    else:
+        with open(args.batch, 'r') as file:
+            sys.exit(1 if run_batch(JournalApp(), file, args.commit_every) else 0)
@@ -0,0 +1,105 @@
+"""models.py: Compact record classes for the rows main.py reads, and the renderer that prints them."""
+
+# Standard Library
+from typing import Callable, Dict, Sequence, Type, Union
+
+# Local Modules
+from queries import Error
+
+
+class Record:
+    """
+    Base for the row records below. Fields are `__slots__` (no per-instance dict) and are
+    listed in the column order of the statement the record is read from, so
+    `from_row` maps a cursor row straight onto them.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *values: object) -> None:
+        if len(values) != len(self.__slots__):
+            raise TypeError(f"{type(self).__name__} takes {len(self.__slots__)} values, got {len(values)}")
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def from_row(cls, row: Sequence, columns: Sequence[str] = None) -> 'Record':
+        """Raise `Error` if the row does not have one column per field. `columns` are the cursor's column names."""
+        if len(row) != len(cls.__slots__):
+            raise Error(msg=f"Unexpected result shape for {cls.__name__}: {len(row)} columns, expected {len(cls.__slots__)}")
+        return cls(*row)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other: object) -> bool:
+        return type(other) is type(self) and other.as_dict() == self.as_dict()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class LoginRole(Record):
+    """A LOGIN_TO_ROLE entry (`get_role_from_login`)."""
+    __slots__ = ('role_id', 'role_type')
+
+
+class Author(Record):
+    """A primary author's profile (`login_author`)."""
+    __slots__ = ('f_name', 'l_name', 'email')
+
+
+class Editor(Record):
+    """An editor's profile (`login_editor`)."""
+    __slots__ = ('f_name', 'l_name')
+
+
+class Reviewer(Record):
+    """A reviewer's profile (`login_reviewer`)."""
+    __slots__ = ('f_name', 'l_name')
+
+
+class Manuscript(Record):
+    """One of an author's manuscripts (`author_status`)."""
+    __slots__ = ('manuscript_id', 'title', 'date_received', 'status', 'status_updated_at')
+
+
+class Review(Record):
+    """
+    A manuscript assigned to the logged-in reviewer: one row of the ReviewStatus view
+    (`review_status`). The view is defined on the server, not here, so the row keeps
+    whatever columns it has, named as the cursor reports them.
+    """
+    __slots__ = ('columns', 'values')
+
+    @classmethod
+    def from_row(cls, row: Sequence, columns: Sequence[str] = None) -> 'Review':
+        if columns is None or len(columns) != len(row):
+            raise Error(msg=f"Unexpected result shape for Review: {len(row)} values for columns {columns}")
+        return cls(tuple(columns), tuple(row))
+
+    def get(self, column: str) -> object:
+        """The value of `column`, or None if the view has no such column."""
+        return dict(zip(self.columns, self.values)).get(column)
+
+
+# How `render` prints each record type: a format string whose fields are filled in by
+# name, or a function of the record.
+TEMPLATES: Dict[Type[Record], Union[str, Callable[[Record], str]]] = {
+    LoginRole: "Login for {role_type} {role_id}",
+    Author: "{f_name} {l_name}, {email}",
+    Editor: "{f_name} {l_name}",
+    Reviewer: "{f_name} {l_name}",
+    Manuscript: (
+        "Manuscript{manuscript_id} -- Title: '{title}';  Date received: '{date_received}';  "
+        "Current status: '{status}';  Status last updated at: '{status_updated_at}'"
+    ),
+    Review: lambda review: ";  ".join(f"{column}: '{value}'" for column, value in zip(review.columns, review.values)),
+}
+
+
+def render(record: Record) -> str:
+    """The one-line form of `record` the shell prints."""
+    template = TEMPLATES[type(record)]
+    return template(record) if callable(template) else template.format(**record.as_dict())
@@ -0,0 +1,418 @@
+"""queries.py: Every statement main.py issues, declared once and run as a server-side prepared statement."""
+
+# Standard Library
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Sequence, Tuple, Union
+
+# Local Modules
+from instrumentation import STATS
+
+if TYPE_CHECKING:
+    # only for annotations; the driver is imported when the first connection opens
+    from mysql.connector import MySQLConnection
+    from mysql.connector.cursor import MySQLCursorPrepared
+
+# Statement name -> SQL with `%s` placeholders for bound parameters.
+STATEMENTS: Dict[str, str] = {
+    # registration
+    'register_unique_id': "INSERT INTO `LOGIN_TO_ROLE` (`roleID`, `role_type`) VALUES (%s, %s);",
+    'register_author': "INSERT INTO `PRIMARY_AUTHOR` (`f_name`, `l_name`, `email`, `affiliation`) VALUES (%s, %s, %s, %s);",
+    'register_editor': "INSERT INTO `EDITOR` (`f_name`, `l_name`) VALUES (%s, %s);",
+    'register_reviewer': "INSERT INTO `REVIEWER` (`f_name`, `l_name`) VALUES (%s, %s);",
+
+    # login
+    'get_role_from_login': "SELECT `roleID`, `role_type` FROM `LOGIN_TO_ROLE` WHERE `loginID` = %s;",
+    'login_author': "SELECT `f_name`, `l_name`, `email` FROM `PRIMARY_AUTHOR` WHERE `authorID` = %s;",
+    'login_editor': "SELECT `f_name`, `l_name` FROM `EDITOR` WHERE `editorID` = %s;",
+    'login_reviewer': "SELECT `f_name`, `l_name` FROM `REVIEWER` WHERE `reviewerID` = %s;",
+    'set_review_status_reviewer': "SET @rev_id = %s;",
+    # the view is defined on the server; its columns are read off the cursor
+    'review_status': "SELECT * FROM `ReviewStatus` LIMIT %s;",
+
+    # resign
+    'resign_expertise': "DELETE FROM `REVIEWER_EXPERTISE` WHERE `REVIEWER_reviewerID` = %s;",
+    'resign_login': "DELETE FROM `LOGIN_TO_ROLE` WHERE `roleID` = %s AND `role_type` = 'reviewer';",
+    'resign_reviewer': "DELETE FROM `REVIEWER` WHERE `reviewerID` = %s;",
+
+    # accept / reject
+    # run only when a guarded `give_feedback` changed nothing, to say why
+    'review_target': (
+        "SELECT m.`status`, r.`REVIEWER_reviewerID` IS NOT NULL FROM `MANUSCRIPT` m LEFT JOIN `REVIEW` r "
+        "ON r.`MANUSCRIPT_manuscriptID` = m.`manuscriptID` AND r.`REVIEWER_reviewerID` = %s WHERE m.`manuscriptID` = %s;"
+    ),
+    # scores a review not scored yet, completing it
+    'give_feedback': (
+        "UPDATE `REVIEW` SET `score_a` = %s, `score_c` = %s, `score_m` = %s, `score_e` = %s, `rec_score` = %s, "
+        "`date_feedback_received` = now() WHERE `MANUSCRIPT_manuscriptID` = %s AND `REVIEWER_reviewerID` = %s "
+        "AND `date_feedback_received` IS NULL "
+        "AND `MANUSCRIPT_manuscriptID` IN (SELECT `manuscriptID` FROM `MANUSCRIPT` WHERE `manuscriptID` = %s AND `status` = 'UnderReview');"
+    ),
+    # same parameters; replaces the scores of a review that was already completed
+    'revise_feedback': (
+        "UPDATE `REVIEW` SET `score_a` = %s, `score_c` = %s, `score_m` = %s, `score_e` = %s, `rec_score` = %s, "
+        "`date_feedback_received` = now() WHERE `MANUSCRIPT_manuscriptID` = %s AND `REVIEWER_reviewerID` = %s "
+        "AND `MANUSCRIPT_manuscriptID` IN (SELECT `manuscriptID` FROM `MANUSCRIPT` WHERE `manuscriptID` = %s AND `status` = 'UnderReview');"
+    ),
+
+    # submit
+    'submit_manuscript': (
+        "INSERT INTO `MANUSCRIPT` (`title`, `document`, `status`, `PRIMARY_AUTHOR_authorID`, `ICODE_code`) "
+        "VALUES (%s, %s, %s, %s, %s);"
+    ),
+
+    # status
+    'author_status': (
+        "SELECT `manuscriptID`, `title`, `date_received`, `status`, `status_updated_at` "
+        "FROM `MANUSCRIPT` WHERE `PRIMARY_AUTHOR_authorID` = %s LIMIT %s;"
+    ),
+    # one page of the editor dashboard: manuscripts after the given id (keyset pagination)
+    'editor_status_page': (
+        "SELECT m.`manuscriptID`, m.`title`, m.`status`, "
+        "COUNT(r.`REVIEWER_reviewerID`), COUNT(r.`date_feedback_received`), "
+        "AVG(r.`score_a`), AVG(r.`score_c`), AVG(r.`score_m`), AVG(r.`score_e`) "
+        "FROM `MANUSCRIPT` m LEFT JOIN `REVIEW` r ON r.`MANUSCRIPT_manuscriptID` = m.`manuscriptID` "
+        "WHERE m.`manuscriptID` > %s "
+        "GROUP BY m.`manuscriptID`, m.`title`, m.`status` "
+        "ORDER BY m.`manuscriptID` LIMIT %s;"
+    ),
+
+    # assign
+    'reviewer_expertise_all': "SELECT `REVIEWER_reviewerID`, `ICODE_code` FROM `REVIEWER_EXPERTISE`;",
+    'open_review_counts': (
+        "SELECT `REVIEWER_reviewerID`, COUNT(*) FROM `REVIEW` "
+        "WHERE `date_feedback_received` IS NULL GROUP BY `REVIEWER_reviewerID`;"
+    ),
+    'manuscript_icode': "SELECT `ICODE_code`, `status` FROM `MANUSCRIPT` WHERE `manuscriptID` = %s;",
+    'manuscript_reviewers': "SELECT `REVIEWER_reviewerID` FROM `REVIEW` WHERE `MANUSCRIPT_manuscriptID` = %s;",
+    'start_review': "UPDATE `MANUSCRIPT` SET `status` = 'UnderReview' WHERE `manuscriptID` = %s AND `status` = 'submitted';",
+}
+
+# Tables and views `export` can dump; each gets an `export_<name>` statement below.
+EXPORT_SOURCES = (
+    'PRIMARY_AUTHOR', 'EDITOR', 'REVIEWER', 'REVIEWER_EXPERTISE', 'LOGIN_TO_ROLE',
+    'MANUSCRIPT', 'SECONDARY_AUTHOR', 'REVIEW', 'ReviewStatus',
+)
+STATEMENTS.update({f'export_{source}': f"SELECT * FROM `{source}`;" for source in EXPORT_SOURCES})
+
+# LIMIT value for statements whose row cap is optional
+NO_LIMIT = 2 ** 63 - 1
+
+# Sized statements (one per distinct row count) kept prepared on a connection; past this
+# the least recently used is closed, so odd-sized chunks can't pile up on the server.
+MAX_SIZED_STATEMENTS = 16
+
+# Multi-row INSERTs: statement name -> (INSERT prefix, one row's VALUES tuple).
+# The tuple is repeated once per row by `Queries.insert_rows`.
+BULK_STATEMENTS: Dict[str, Tuple[str, str]] = {
+    'import_reviewers': ("INSERT INTO `REVIEWER` (`f_name`, `l_name`) VALUES ", "(%s, %s)"),
+    'import_reviewer_expertise': ("INSERT INTO `REVIEWER_EXPERTISE` (`REVIEWER_reviewerID`, `ICODE_code`) VALUES ", "(%s, %s)"),
+    'import_logins': ("INSERT INTO `LOGIN_TO_ROLE` (`roleID`, `role_type`) VALUES ", "(%s, %s)"),
+    'add_secondary_authors': ("INSERT INTO `SECONDARY_AUTHOR` (`priority`, `MANUSCRIPT_manuscriptID`, `full_name`) VALUES ", "(%s, %s, %s)"),
+    'assign_reviews': ("INSERT INTO `REVIEW` (`MANUSCRIPT_manuscriptID`, `REVIEWER_reviewerID`) VALUES ", "(%s, %s)"),
+}
+
+
+# REVIEW columns set by a review, in the order `give_feedback_many` takes their values
+SCORE_COLUMNS = ('score_a', 'score_c', 'score_m', 'score_e', 'rec_score')
+
+
+def _in_list(count: int) -> str:
+    return ", ".join(["%s"] * count)
+
+
+def _score_cases(count: int) -> str:
+    """`col = CASE manuscriptID WHEN %s THEN %s ... END` for every score column."""
+    whens = " ".join(["WHEN %s THEN %s"] * count)
+    return ", ".join(f"`{column}` = CASE `MANUSCRIPT_manuscriptID` {whens} END" for column in SCORE_COLUMNS)
+
+
+# Statements over a variable number of ids: name -> SQL for `count` of them.
+# Run with `Queries.execute_sized` / `Queries.fetchall_sized`.
+SIZED_STATEMENTS: Dict[str, Callable[[int], str]] = {
+    # params: reviewer id, then the manuscript ids
+    'review_targets': lambda count: (
+        "SELECT m.`manuscriptID`, m.`status`, r.`REVIEWER_reviewerID` IS NOT NULL, r.`date_feedback_received` IS NULL "
+        "FROM `MANUSCRIPT` m LEFT JOIN `REVIEW` r "
+        "ON r.`MANUSCRIPT_manuscriptID` = m.`manuscriptID` AND r.`REVIEWER_reviewerID` = %s "
+        f"WHERE m.`manuscriptID` IN ({_in_list(count)});"
+    ),
+    # params: (manuscript id, value) pairs per SCORE_COLUMNS column, then the reviewer id
+    # and the manuscript ids twice; like `give_feedback`, only manuscripts UnderReview are updated
+    'give_feedback_many': lambda count: (
+        f"UPDATE `REVIEW` SET {_score_cases(count)}, `date_feedback_received` = now() "
+        f"WHERE `REVIEWER_reviewerID` = %s AND `MANUSCRIPT_manuscriptID` IN ({_in_list(count)}) "
+        "AND `MANUSCRIPT_manuscriptID` IN (SELECT `manuscriptID` FROM `MANUSCRIPT` "
+        f"WHERE `manuscriptID` IN ({_in_list(count)}) AND `status` = 'UnderReview');"
+    ),
+}
+
+
+# MySQL client error codes meaning the link to the server is gone
+# (CR_SERVER_GONE_ERROR, CR_SERVER_LOST, CR_SERVER_LOST_EXTENDED)
+LOST_CONNECTION_ERRNOS = {2006, 2013, 2055}
+
+
+class Error(Exception):
+    """
+    A failed database operation, whichever backend raised it. Handlers catch this one
+    type; `msg` and `errno` carry the driver's message and error code.
+    """
+
+    def __init__(self, msg: str = None, errno: int = None) -> None:
+        super().__init__(msg)
+        self.msg = msg
+        self.errno = errno
+
+
+@contextmanager
+def driver_errors(driver_error: type) -> Iterator[None]:
+    """Re-raise the driver's `driver_error` exceptions from the block as `Error`."""
+    try:
+        yield
+    except Error:
+        raise
+    except driver_error as err:
+        raise Error(msg=getattr(err, 'msg', None) or str(err), errno=getattr(err, 'errno', None)) from err
+
+
+class Queries:
+    """
+    Runs named STATEMENTS on one connection with bound parameters.
+    Each statement keeps its own prepared cursor, so the server parses it once for
+    the life of the connection and every later call only sends the parameters.
+    `prepares`, `executions` and `errors` count server parses, executions and failed
+    statements so far; latency and row counts per statement, and prepares per command,
+    go to instrumentation.STATS.
+    While `defer_commits` is set, `commit()` does nothing and the
+    caller commits with `flush()` instead (batch mode groups commands this way).
+    Exceptions of the connection's `driver_error` class are raised as `Error`; `lost`
+    is set once one of them says the server dropped the connection.
+    """
+
+    def __init__(self, conn: 'MySQLConnection', driver_error: type = Error) -> None:
+        self.conn = conn
+        self.driver_error = driver_error
+        self.prepares = 0
+        self.executions = 0
+        self.errors = 0
+        self.defer_commits = False
+        self.lost = False
+        self._cursors: Dict[str, 'MySQLCursorPrepared'] = {}
+        self._sized_sql_cache: 'OrderedDict[str, str]' = OrderedDict()
+        self._connection_id = conn.connection_id
+
+    @contextmanager
+    def _driver_errors(self) -> Iterator[None]:
+        try:
+            with driver_errors(self.driver_error):
+                yield
+        except Error as err:
+            if err.errno in LOST_CONNECTION_ERRNOS:
+                self.lost = True
+            raise
+
+    def _cursor(self, name: str) -> 'MySQLCursorPrepared':
+        cursor = self._cursors.get(name)
+        if cursor is None:
+            cursor = self._cursors[name] = self.conn.cursor(prepared=True)
+            self.prepares += 1
+            STATS.record_prepare()
+        return cursor
+
+    def execute(self, name: str, params: Sequence = ()) -> 'MySQLCursorPrepared':
+        """
+        Execute statement `name` and return its cursor (for lastrowid / rowcount / rows).
+        Rows, if any, must be consumed before the next statement runs.
+        """
+        start = time.perf_counter()
+        cursor = self._execute(name, STATEMENTS[name], params)
+        STATS.record(name, time.perf_counter() - start, max(cursor.rowcount, 0))
+        return cursor
+
+    def insert_rows(self, name: str, rows: Sequence[Sequence]) -> 'MySQLCursorPrepared':
+        """
+        Insert all `rows` with the single multi-row BULK_STATEMENTS[name] INSERT.
+        One statement is prepared per distinct row count (the MAX_SIZED_STATEMENTS
+        most recent are kept), so a stream of equal-sized chunks is parsed once. `lastrowid` on the returned cursor is the first
+        generated id; a multi-row INSERT allocates the rest consecutively after it.
+        """
+        prefix, values = BULK_STATEMENTS[name]
+        return self._execute_sized(name, len(rows), lambda count: prefix + ", ".join([values] * count) + ";",
+                                   [param for row in rows for param in row])
+
+    def execute_sized(self, name: str, count: int, params: Sequence) -> 'MySQLCursorPrepared':
+        """Execute SIZED_STATEMENTS[name] built for `count` ids; prepared once per distinct count, like `insert_rows`."""
+        return self._execute_sized(name, count, SIZED_STATEMENTS[name], params)
+
+    def fetchall_sized(self, name: str, count: int, params: Sequence) -> List[tuple]:
+        start = time.perf_counter()
+        cursor = self._execute(*self._sized_sql(name, count, SIZED_STATEMENTS[name]), params)
+        with self._driver_errors():
+            rows = cursor.fetchall()
+        STATS.record(name, time.perf_counter() - start, len(rows))
+        return rows
+
+    def _sized_sql(self, name: str, count: int, build: Callable[[int], str]) -> Tuple[str, str]:
+        key = f"{name}*{count}"
+        sql = self._sized_sql_cache.get(key)
+        if sql is None:
+            sql = self._sized_sql_cache[key] = build(count)
+            if len(self._sized_sql_cache) > MAX_SIZED_STATEMENTS:
+                oldest, _ = self._sized_sql_cache.popitem(last=False)
+                self._discard(oldest)
+        else:
+            self._sized_sql_cache.move_to_end(key)
+        return key, sql
+
+    def _execute_sized(self, name: str, count: int, build: Callable[[int], str], params: Sequence) -> 'MySQLCursorPrepared':
+        start = time.perf_counter()
+        cursor = self._execute(*self._sized_sql(name, count, build), params)
+        STATS.record(name, time.perf_counter() - start, max(cursor.rowcount, 0))
+        return cursor
+
+    def _execute(self, name: str, sql: str, params: Sequence) -> 'MySQLCursorPrepared':
+        try:
+            with self._driver_errors():
+                cursor = self._cursor(name)
+                # passing the same str object lets the cursor skip re-preparing
+                cursor.execute(sql, tuple(params))
+        except Error:
+            # the statement may not have been prepared; start over next time
+            self._discard(name)
+            self.errors += 1
+            raise
+        self.executions += 1
+        return cursor
+
+    def stream(self, name: str, params: Sequence = (), page_size: int = 100) -> Iterator[tuple]:
+        """
+        Execute statement `name` and yield its rows as they arrive off the socket,
+        reading `page_size` at a time, so at most one page is ever held client-side.
+        If the caller stops early the rest of the result is drained so the
+        connection stays usable.
+        """
+        # only time spent talking to the server counts, not the caller's work per row
+        start = time.perf_counter()
+        cursor = self._execute(name, STATEMENTS[name], params)
+        elapsed, count = time.perf_counter() - start, 0
+        exhausted = False
+        try:
+            while True:
+                start = time.perf_counter()
+                with self._driver_errors():
+                    rows = cursor.fetchmany(page_size)
+                elapsed += time.perf_counter() - start
+                if not rows:
+                    exhausted = True
+                    return
+                count += len(rows)
+                yield from rows
+        finally:
+            if not exhausted:
+                with self._driver_errors():
+                    while cursor.fetchmany(page_size):
+                        pass
+            STATS.record(name, elapsed, count)
+
+    @property
+    def dialect(self) -> str:
+        """'mysql', or the `dialect` a stand-in connection declares."""
+        return getattr(self.conn, 'dialect', 'mysql')
+
+    def explain(self, sql: str, params: Sequence) -> Tuple[List[str], List[tuple]]:
+        """
+        Return the column names and rows of the query plan for `sql` (not a named
+        statement, so nothing is prepared or counted). The statement itself is not run.
+        """
+        prefix = "EXPLAIN QUERY PLAN " if self.dialect == 'sqlite' else "EXPLAIN "
+        with self._driver_errors():
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute(prefix + sql, tuple(params))
+                return [column[0] for column in cursor.description], cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def columns(self, name: str) -> List[str]:
+        """Column names of the result statement `name` produced when last executed."""
+        return [column[0] for column in self._cursors[name].description]
+
+    def fetchone(self, name: str, params: Sequence = ()) -> Union[tuple, None]:
+        rows = self.fetchall(name, params)
+        return rows[0] if rows else None
+
+    def fetchall(self, name: str, params: Sequence = ()) -> List[tuple]:
+        start = time.perf_counter()
+        cursor = self._execute(name, STATEMENTS[name], params)
+        with self._driver_errors():
+            rows = cursor.fetchall()
+        STATS.record(name, time.perf_counter() - start, len(rows))
+        return rows
+
+    def commit(self) -> None:
+        if not self.defer_commits:
+            self.flush()
+
+    def flush(self) -> None:
+        """Commit regardless of `defer_commits`."""
+        with self._driver_errors():
+            self.conn.commit()
+
+    def rollback(self) -> None:
+        with self._driver_errors():
+            self.conn.rollback()
+
+    @contextmanager
+    def atomic(self) -> Iterator[None]:
+        """
+        Undo every statement in the block if it raises.
+        With `defer_commits` set the block is wrapped in a savepoint, so earlier
+        uncommitted work in the same batch survives the rollback.
+        """
+        if not self.defer_commits:
+            try:
+                yield
+            except BaseException:
+                self.rollback()
+                raise
+            return
+
+        with self._driver_errors():
+            cursor = self.conn.cursor()
+            cursor.execute("SAVEPOINT `atomic_block`;")
+        try:
+            yield
+        except BaseException:
+            with self._driver_errors():
+                cursor.execute("ROLLBACK TO SAVEPOINT `atomic_block`;")
+            raise
+        else:
+            with self._driver_errors():
+                cursor.execute("RELEASE SAVEPOINT `atomic_block`;")
+        finally:
+            cursor.close()
+
+    def revalidate(self) -> None:
+        """
+        Drop cached statements if the underlying session changed (e.g. after a reconnect),
+        since the server forgets prepared statements with the session.
+        """
+        if self.conn.connection_id != self._connection_id:
+            self._cursors.clear()
+            self._connection_id = self.conn.connection_id
+
+    def _discard(self, name: str) -> None:
+        cursor = self._cursors.pop(name, None)
+        if cursor is not None:
+            try:
+                cursor.close()
+            except self.driver_error:
+                pass
+
+    def close(self) -> None:
+        for name in list(self._cursors):
+            self._discard(name)
+        with self._driver_errors():
+            self.conn.close()
@@ -0,0 +1,85 @@
+"""reviewer_index.py: In-memory ICode -> reviewers index and open-review counts used by `assign`."""
+
+# Standard Library
+import heapq
+import threading
+import time
+from typing import Dict, Iterable, List, Set
+
+# Local Modules
+from queries import Queries
+
+
+class ReviewerIndex:
+    """
+    Which reviewers cover each ICode, and how many unfinished reviews each one has.
+    Loaded from the database on first use (two streamed queries) and then kept up to
+    date by the handlers that register, import, resign, assign and review. A full
+    reload happens after `max_age` seconds to pick up changes made by other processes.
+    """
+
+    def __init__(self, max_age: float = 300.0) -> None:
+        self.max_age = max_age
+        self._by_icode: Dict[int, Set[int]] = {}
+        self._open_reviews: Dict[int, int] = {}
+        self._loaded_at: float = None
+        self._lock = threading.RLock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def load(self, db: Queries) -> None:
+        by_icode: Dict[int, Set[int]] = {}
+        open_reviews: Dict[int, int] = {}
+        for reviewer_id, i_code in db.stream('reviewer_expertise_all'):
+            by_icode.setdefault(i_code, set()).add(reviewer_id)
+            open_reviews[reviewer_id] = 0
+        for reviewer_id, count in db.stream('open_review_counts'):
+            if reviewer_id in open_reviews:
+                open_reviews[reviewer_id] = count
+        with self._lock:
+            self._by_icode, self._open_reviews = by_icode, open_reviews
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self, db: Queries) -> None:
+        if not self.loaded or time.monotonic() - self._loaded_at > self.max_age:
+            self.load(db)
+
+    def least_loaded(self, i_code: int, n: int, exclude: Iterable[int] = ()) -> List[int]:
+        """The `n` reviewers with expertise in `i_code` and the fewest open reviews."""
+        exclude = set(exclude)
+        with self._lock:
+            candidates = self._by_icode.get(i_code, set()) - exclude
+            return heapq.nsmallest(n, candidates, key=lambda reviewer_id: (self._open_reviews[reviewer_id], reviewer_id))
+
+    # --- incremental updates (no-ops until the index has been loaded) ---
+    def add_reviewer(self, reviewer_id: int, i_codes: Iterable[int]) -> None:
+        with self._lock:
+            if not self.loaded:
+                return
+            for i_code in i_codes:
+                self._by_icode.setdefault(i_code, set()).add(reviewer_id)
+            self._open_reviews.setdefault(reviewer_id, 0)
+
+    def remove_reviewer(self, reviewer_id: int) -> None:
+        with self._lock:
+            if not self.loaded:
+                return
+            for reviewers in self._by_icode.values():
+                reviewers.discard(reviewer_id)
+            self._open_reviews.pop(reviewer_id, None)
+
+    def review_assigned(self, reviewer_id: int) -> None:
+        with self._lock:
+            if reviewer_id in self._open_reviews:
+                self._open_reviews[reviewer_id] += 1
+
+    def review_completed(self, reviewer_id: int) -> None:
+        with self._lock:
+            if self._open_reviews.get(reviewer_id):
+                self._open_reviews[reviewer_id] -= 1
+
+
+# shared by every session in the process
+REVIEWER_INDEX = ReviewerIndex()
@@ -0,0 +1,93 @@
+-- schema_sqlite.sql: SQLite version of the journal schema, used by the local stand-in backend.
+-- Everything above the `-- @session` marker is created once per database file;
+-- everything below it is re-created on every connection (TEMP objects).
+
+CREATE TABLE IF NOT EXISTS `PRIMARY_AUTHOR` (
+    `authorID` INTEGER PRIMARY KEY AUTOINCREMENT,
+    `f_name` VARCHAR(45) NOT NULL,
+    `l_name` VARCHAR(45) NOT NULL,
+    `email` VARCHAR(100) NOT NULL,
+    `affiliation` VARCHAR(100)
+);
+
+CREATE TABLE IF NOT EXISTS `EDITOR` (
+    `editorID` INTEGER PRIMARY KEY AUTOINCREMENT,
+    `f_name` VARCHAR(45) NOT NULL,
+    `l_name` VARCHAR(45) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS `REVIEWER` (
+    `reviewerID` INTEGER PRIMARY KEY AUTOINCREMENT,
+    `f_name` VARCHAR(45) NOT NULL,
+    `l_name` VARCHAR(45) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS `REVIEWER_EXPERTISE` (
+    `REVIEWER_reviewerID` INTEGER NOT NULL REFERENCES `REVIEWER` (`reviewerID`) ON DELETE CASCADE,
+    `ICODE_code` INTEGER NOT NULL,
+    PRIMARY KEY (`REVIEWER_reviewerID`, `ICODE_code`)
+);
+
+CREATE TABLE IF NOT EXISTS `LOGIN_TO_ROLE` (
+    `loginID` INTEGER PRIMARY KEY AUTOINCREMENT,
+    `roleID` INTEGER NOT NULL,
+    `role_type` VARCHAR(10) NOT NULL CHECK (`role_type` IN ('author', 'editor', 'reviewer'))
+);
+
+CREATE TABLE IF NOT EXISTS `MANUSCRIPT` (
+    `manuscriptID` INTEGER PRIMARY KEY AUTOINCREMENT,
+    `title` VARCHAR(100) NOT NULL,
+    `document` BLOB,
+    `status` VARCHAR(20) NOT NULL DEFAULT 'submitted',
+    `date_received` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    `status_updated_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    `PRIMARY_AUTHOR_authorID` INTEGER NOT NULL REFERENCES `PRIMARY_AUTHOR` (`authorID`),
+    `ICODE_code` INTEGER NOT NULL,
+    `EDITOR_editorID` INTEGER REFERENCES `EDITOR` (`editorID`)
+);
+
+CREATE TRIGGER IF NOT EXISTS `MANUSCRIPT_status_updated`
+AFTER UPDATE OF `status` ON `MANUSCRIPT`
+BEGIN
+    UPDATE `MANUSCRIPT` SET `status_updated_at` = CURRENT_TIMESTAMP WHERE `manuscriptID` = NEW.`manuscriptID`;
+END;
+
+CREATE TABLE IF NOT EXISTS `SECONDARY_AUTHOR` (
+    `priority` INTEGER NOT NULL,
+    `MANUSCRIPT_manuscriptID` INTEGER NOT NULL REFERENCES `MANUSCRIPT` (`manuscriptID`),
+    `full_name` VARCHAR(100) NOT NULL,
+    PRIMARY KEY (`MANUSCRIPT_manuscriptID`, `priority`)
+);
+
+CREATE TABLE IF NOT EXISTS `REVIEW` (
+    `MANUSCRIPT_manuscriptID` INTEGER NOT NULL REFERENCES `MANUSCRIPT` (`manuscriptID`),
+    `REVIEWER_reviewerID` INTEGER NOT NULL REFERENCES `REVIEWER` (`reviewerID`) ON DELETE CASCADE,
+    `date_sent` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    `score_a` INTEGER,
+    `score_c` INTEGER,
+    `score_m` INTEGER,
+    `score_e` INTEGER,
+    `rec_score` INTEGER,
+    `date_feedback_received` DATETIME,
+    PRIMARY KEY (`MANUSCRIPT_manuscriptID`, `REVIEWER_reviewerID`)
+);
+
+-- @session
+-- MySQL user variables (`SET @rev_id = ...`) are emulated with a per-connection table.
+CREATE TEMP TABLE IF NOT EXISTS `SESSION_VARIABLE` (
+    `name` VARCHAR(64) PRIMARY KEY,
+    `value`
+);
+
+-- Manuscripts assigned to the reviewer in @rev_id, from under review through accepted/rejected.
+CREATE TEMP VIEW IF NOT EXISTS `ReviewStatus` AS
+SELECT m.`manuscriptID`, m.`title`, m.`status`, m.`status_updated_at`, r.`date_sent`, r.`date_feedback_received`
+FROM `REVIEW` r JOIN `MANUSCRIPT` m ON m.`manuscriptID` = r.`MANUSCRIPT_manuscriptID`
+WHERE r.`REVIEWER_reviewerID` = (SELECT `value` FROM `SESSION_VARIABLE` WHERE `name` = 'rev_id')
+ORDER BY CASE m.`status`
+    WHEN 'UnderReview' THEN 0
+    WHEN 'submitted' THEN 1
+    WHEN 'Accepted' THEN 2
+    WHEN 'Rejected' THEN 3
+    ELSE 4
+END, m.`manuscriptID`;
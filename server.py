@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+
+"""server.py: Serve many concurrent journal shell sessions from one process over TCP or a unix socket."""
+
+# Standard Library
+import argparse
+import asyncio
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+# Local Modules
+from dbpool import ConnectionPool
+from group_commit import GROUP_COMMIT
+from main import JournalApp
+
+
+class SessionOutput(io.TextIOBase):
+    """
+    Stand-in for sys.stdout. While a worker thread runs a session's command, whatever
+    the handlers print goes to that command's buffer; other writes reach the real stdout.
+    """
+
+    def __init__(self, fallback: io.TextIOBase) -> None:
+        self._fallback = fallback
+        self._local = threading.local()
+
+    @contextmanager
+    def capture(self) -> Iterator[io.StringIO]:
+        buffer = self._local.buffer = io.StringIO()
+        try:
+            yield buffer
+        finally:
+            self._local.buffer = None
+
+    def write(self, text: str) -> int:
+        return (getattr(self._local, 'buffer', None) or self._fallback).write(text)
+
+    def flush(self) -> None:
+        self._fallback.flush()
+
+
+def run_command(app: JournalApp, output: SessionOutput, line: str) -> Tuple[bool, str]:
+    """Run one command line for a session (in a worker thread); return (stop, printed output)."""
+    with output.capture() as buffer:
+        try:
+            stop = bool(app.onecmd(line))
+        except Exception as err:
+            print(f"{err}\n")
+            stop = False
+    return stop, buffer.getvalue()
+
+
+class JournalServer:
+    """
+    Accepts connections and gives each one its own JournalApp (and so its own login
+    Session). Commands run on a bounded thread pool against the shared ConnectionPool,
+    so a few database connections serve every session; each session's commands still
+    run one at a time, in order.
+    """
+
+    def __init__(self, pool: ConnectionPool, workers: int) -> None:
+        self.pool = pool
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='journal')
+        self.output = SessionOutput(sys.stdout)
+        self.sessions = 0
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        app = JournalApp(pool=self.pool, stdout=self.output)
+        self.sessions += 1
+        peer = writer.get_extra_info('peername') or 'local client'
+        print(f"session opened: {peer} ({self.sessions} active)")
+        try:
+            writer.write((app.intro + '\n' + app.prompt).encode())
+            await writer.drain()
+            while True:
+                data = await reader.readline()
+                if not data:
+                    break
+                line = data.decode(errors='replace').rstrip('\r\n')
+                stop, text = await loop.run_in_executor(self.executor, run_command, app, self.output, line)
+                writer.write(text.encode())
+                if stop:
+                    break
+                writer.write(app.prompt.encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= 1
+            print(f"session closed: {peer} ({self.sessions} active)")
+            writer.close()
+
+    async def serve(self, host: str, port: int, unix_path: str = None) -> None:
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_client, path=unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_client, host=host, port=port)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"Journal server listening on {addresses}")
+        async with server:
+            await server.serve_forever()
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve concurrent Journal DB Manager sessions")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6161)
+    parser.add_argument('--unix', metavar='PATH', help="listen on a unix socket instead of TCP")
+    parser.add_argument('--workers', type=int, default=16,
+                        help="threads running commands (default: 16); database connections are bounded separately by [pool]")
+    parser.add_argument('--config', default='Team22Lab2.ini')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    pool = ConnectionPool(args.config)
+    # connect once up front so a bad config (or the password prompt) happens here, not in a worker
+    pool.release(pool.acquire())
+    server = JournalServer(pool, args.workers)
+    sys.stdout = server.output
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.executor.shutdown(wait=False)
+        GROUP_COMMIT.drain()
+        pool.close()
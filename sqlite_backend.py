@@ -0,0 +1,136 @@
+"""sqlite_backend.py: SQLite stand-in for MySQLConnection, for local benchmarks and development."""
+
+# Standard Library
+import itertools
+import os
+import re
+import sqlite3
+from io import IOBase
+from typing import Dict, List, Sequence, Union
+
+# Local Modules
+from queries import Error
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema_sqlite.sql')
+SESSION_MARKER = '-- @session'
+
+# MySQL-only syntax used by queries.STATEMENTS and its SQLite equivalent
+_SET_VARIABLE = re.compile(r"^\s*SET\s+@(\w+)\s*=\s*%s\s*;?\s*$", re.IGNORECASE)
+_NOW = re.compile(r"\bnow\(\)", re.IGNORECASE)
+# statements that open a transaction first, as every statement does in MySQL with autocommit off
+_WRITE = re.compile(r"^\s*(?:INSERT|UPDATE|DELETE|REPLACE|SAVEPOINT)\b", re.IGNORECASE)
+
+_connection_ids = itertools.count(1)
+
+
+def translate(sql: str) -> str:
+    """Rewrite one MySQL statement (with `%s` placeholders) for SQLite."""
+    match = _SET_VARIABLE.match(sql)
+    if match:
+        return f"INSERT OR REPLACE INTO `SESSION_VARIABLE` (`name`, `value`) VALUES ('{match.group(1)}', ?);"
+    return _NOW.sub("CURRENT_TIMESTAMP", sql).replace("%s", "?")
+
+
+def _wrap(err: sqlite3.Error) -> Error:
+    return Error(msg=str(err))
+
+
+class SQLiteCursor:
+    """
+    The slice of the mysql.connector cursor API that `Queries` uses.
+    `lastrowid` follows MySQL: after a multi-row INSERT it is the first generated id.
+    """
+
+    def __init__(self, connection: 'SQLiteConnection') -> None:
+        self._connection = connection
+        self._cursor = connection.raw.cursor()
+        self.lastrowid: Union[int, None] = None
+        self.rowcount = -1
+
+    @property
+    def description(self) -> Union[tuple, None]:
+        return self._cursor.description
+
+    def execute(self, operation: str, params: Sequence = ()) -> None:
+        sql = self._connection.translated(operation)
+        # SQLite can't stream a bound file, so the stand-in reads it whole
+        params = tuple(param.read() if isinstance(param, IOBase) else param for param in params)
+        try:
+            self._connection.begin(operation)
+            self._cursor.execute(sql, params)
+        except sqlite3.Error as err:
+            raise _wrap(err) from err
+        self.rowcount = self._cursor.rowcount
+        self.lastrowid = self._cursor.lastrowid
+        if self.rowcount > 1 and sql.lstrip().upper().startswith("INSERT"):
+            self.lastrowid -= self.rowcount - 1
+
+    def fetchone(self) -> Union[tuple, None]:
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size: int = 1) -> List[tuple]:
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self) -> List[tuple]:
+        return self._cursor.fetchall()
+
+    def close(self) -> None:
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """
+    Embedded database with the journal schema, standing in for MySQLConnection.
+    The schema in SCHEMA_FILE is applied when the connection opens, so a new
+    database file (or ':memory:') is ready to use immediately. Transactions follow
+    MySQL with autocommit off: the first write (or savepoint) begins one, and only
+    `commit()` ends it, so a released savepoint commits nothing.
+    """
+
+    # SQL flavour, for the few callers that must tell backends apart (e.g. EXPLAIN output)
+    dialect = 'sqlite'
+
+    def __init__(self, database: str = ':memory:', schema_file: str = SCHEMA_FILE) -> None:
+        self.database = database
+        self.connection_id = next(_connection_ids)
+        # transactions are begun explicitly; sqlite3's own handling would let the
+        # outermost RELEASE SAVEPOINT commit
+        self.raw = sqlite3.connect(database, check_same_thread=False, isolation_level=None)
+        self.raw.execute("PRAGMA foreign_keys = ON;")
+        self._translated: Dict[str, str] = {}
+        with open(schema_file, 'r') as file:
+            schema, _, session = file.read().partition(SESSION_MARKER)
+        self.raw.executescript(schema + session)
+
+    def translated(self, sql: str) -> str:
+        translated = self._translated.get(sql)
+        if translated is None:
+            translated = self._translated[sql] = translate(sql)
+        return translated
+
+    def begin(self, operation: str) -> None:
+        """Open a transaction if `operation` writes and none is open yet."""
+        if not self.raw.in_transaction and _WRITE.match(operation):
+            # IMMEDIATE takes the write lock now, so two writers queue instead of deadlocking
+            self.raw.execute("BEGIN IMMEDIATE;")
+
+    def cursor(self, prepared: bool = False, buffered: bool = False) -> SQLiteCursor:
+        return SQLiteCursor(self)
+
+    def commit(self) -> None:
+        try:
+            self.raw.commit()
+        except sqlite3.Error as err:
+            raise _wrap(err) from err
+
+    def rollback(self) -> None:
+        try:
+            self.raw.rollback()
+        except sqlite3.Error as err:
+            raise _wrap(err) from err
+
+    def ping(self, reconnect: bool = False, attempts: int = 1, delay: int = 0) -> None:
+        pass
+
+    def close(self) -> None:
+        self.raw.close()
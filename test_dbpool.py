@@ -0,0 +1,47 @@
+"""test_dbpool.py: ConnectionPool hands each caller a connection with no transaction left over from the last one."""
+
+# Standard Library
+import os
+import tempfile
+import unittest
+
+# Local Modules
+from dbpool import ConnectionPool
+
+
+class ConnectionPoolTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        config = os.path.join(self.directory.name, 'journal.ini')
+        with open(config, 'w') as file:
+            file.write(f"[sqlite]\ndatabase = {os.path.join(self.directory.name, 'journal.db')}\n\n[pool]\npool_size = 2\n")
+        self.pool = ConnectionPool(config)
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.directory.cleanup()
+
+    def editors(self, db) -> list:
+        return [f_name for _, f_name, _ in db.fetchall('export_EDITOR')]
+
+    def test_release_ends_the_open_transaction(self) -> None:
+        with self.pool.connection() as db:
+            # a command that never commits
+            db.execute('register_editor', ('uncommitted', 'x'))
+        self.assertFalse(db.conn.raw.in_transaction)
+        with self.pool.connection() as db:
+            self.assertEqual(self.editors(db), [])
+
+    def test_commit_on_one_connection_is_seen_by_another(self) -> None:
+        with self.pool.connection() as reader:
+            reader.execute('register_editor', ('uncommitted', 'x'))
+        with self.pool.connection() as reader, self.pool.connection() as writer:
+            self.assertIsNot(reader, writer)
+            writer.execute('register_editor', ('committed', 'x'))
+            writer.commit()
+            self.assertEqual(self.editors(reader), ['committed'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""test_group_commit.py: GroupCommit's grouping, per-write error isolation and drain, on the SQLite backend."""
+
+# Standard Library
+import os
+import tempfile
+import threading
+import time
+import unittest
+from typing import Callable, Dict, List
+
+# Local Modules
+from group_commit import GroupCommit
+from queries import Error, Queries
+from sqlite_backend import SQLiteConnection
+
+
+def register_editor(name: str) -> Callable[[Queries], int]:
+    return lambda db: db.execute('register_editor', (name, 'x')).lastrowid
+
+
+def record_unknown_reviewer_expertise(db: Queries) -> None:
+    # violates REVIEWER_EXPERTISE's foreign key
+    db.insert_rows('import_reviewer_expertise', [(999, 1)])
+
+
+class RecordingGroupCommit(GroupCommit):
+    """GroupCommit that remembers the size of every group it commits."""
+
+    def __init__(self, *args: int) -> None:
+        super().__init__(*args)
+        self.group_sizes: List[int] = []
+
+    def _commit_group(self, db: Queries, group: list) -> None:
+        self.group_sizes.append(len(group))
+        super()._commit_group(db, group)
+
+
+class GroupCommitTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.database = os.path.join(self.directory.name, 'journal.db')
+        self.connections: List[Queries] = []
+
+    def tearDown(self) -> None:
+        for db in self.connections:
+            db.close()
+        self.directory.cleanup()
+
+    def connect(self) -> Queries:
+        db = Queries(SQLiteConnection(self.database))
+        self.connections.append(db)
+        return db
+
+    def run_concurrently(self, group_commit: GroupCommit, writes: List[Callable[[Queries], object]]) -> Dict[int, object]:
+        """Run each write through `group_commit` on its own thread and connection; return results (or errors) by index."""
+        outcomes: Dict[int, object] = {}
+        connections = [self.connect() for _ in writes]
+
+        def run(index: int) -> None:
+            try:
+                outcomes[index] = group_commit.run(connections[index], writes[index])
+            except Error as err:
+                outcomes[index] = err
+
+        threads = [threading.Thread(target=run, args=(index,)) for index in range(len(writes))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+        return outcomes
+
+    def editors(self) -> List[str]:
+        return [f_name for _, f_name, _ in self.connect().fetchall('export_EDITOR')]
+
+    def test_groups_never_exceed_max_ops(self) -> None:
+        group_commit = RecordingGroupCommit(4, 5000)
+        outcomes = self.run_concurrently(group_commit, [register_editor(f'E{index}') for index in range(32)])
+
+        self.assertEqual(group_commit.group_sizes, [4] * 8)
+        self.assertEqual(group_commit.writes, 32)
+        self.assertEqual(len(set(outcomes.values())), 32)
+        self.assertEqual(sorted(self.editors()), sorted(f'E{index}' for index in range(32)))
+
+    def test_failed_write_is_undone_alone(self) -> None:
+        group_commit = GroupCommit(max_ops=3, max_wait_ms=5000)
+        outcomes = self.run_concurrently(group_commit, [
+            register_editor('before'), record_unknown_reviewer_expertise, register_editor('after'),
+        ])
+
+        self.assertIsInstance(outcomes[1], Error)
+        self.assertIsInstance(outcomes[0], int)
+        self.assertIsInstance(outcomes[2], int)
+        self.assertEqual(group_commit.commits, 1)
+        self.assertEqual(sorted(self.editors()), ['after', 'before'])
+
+    def test_drain_commits_a_waiting_group(self) -> None:
+        group_commit = GroupCommit(max_ops=10, max_wait_ms=60000)
+        writer = threading.Thread(target=self.run_concurrently, args=(group_commit, [register_editor('queued')] * 2))
+        writer.start()
+        while group_commit._group is None or len(group_commit._group) < 2:
+            time.sleep(0.001)
+
+        start = time.monotonic()
+        group_commit.drain()
+        self.assertLess(time.monotonic() - start, 5)
+        # every queued write is committed by the time drain returns
+        self.assertEqual(self.editors(), ['queued', 'queued'])
+        self.assertEqual((group_commit.writes, group_commit.commits), (2, 1))
+        writer.join(timeout=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""test_review.py: `review --file` scores, rejected rows and open-review counts, on the SQLite backend."""
+
+# Standard Library
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from typing import Dict, List, Tuple
+
+# Local Modules
+import main
+from cache import READ_CACHE
+from queries import Queries
+from reviewer_index import REVIEWER_INDEX
+from sqlite_backend import SQLiteConnection
+
+
+class StatusChangingQueries(Queries):
+    """Queries that moves `manuscript_id` out of UnderReview right after the first validation query."""
+
+    def __init__(self, conn: SQLiteConnection, manuscript_id: int) -> None:
+        super().__init__(conn)
+        self.manuscript_id = manuscript_id
+
+    def fetchall_sized(self, name: str, count: int, params: list) -> List[tuple]:
+        rows = super().fetchall_sized(name, count, params)
+        if self.manuscript_id is not None:
+            self.conn.raw.execute("UPDATE `MANUSCRIPT` SET `status` = 'Accepted' WHERE `manuscriptID` = ?;", (self.manuscript_id,))
+            self.manuscript_id = None
+        return rows
+
+
+class ReviewFileTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        READ_CACHE.clear()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def journal(self, db: Queries) -> Dict[str, int]:
+        """
+        Two reviewers and five manuscripts: 1-3 UnderReview with reviewer 1 (3 already
+        scored), 4 UnderReview with reviewer 2 only, 5 assigned to reviewer 1 but still submitted.
+        """
+        author = db.execute('register_author', ('A', 'B', 'a@b', 'U')).lastrowid
+        reviewers = [db.execute('register_reviewer', (f'R{index}', 'B')).lastrowid for index in (1, 2)]
+        db.insert_rows('import_reviewer_expertise', [(reviewer, 1) for reviewer in reviewers])
+        manuscripts = [db.execute('submit_manuscript', (f'T{index}', b'', 'submitted', author, 1)).lastrowid for index in range(5)]
+        db.insert_rows('assign_reviews', [(manuscript, reviewers[0]) for manuscript in manuscripts[:3] + manuscripts[4:]]
+                       + [(manuscripts[3], reviewers[1])])
+        for manuscript in manuscripts[:4]:
+            db.execute('start_review', (manuscript,))
+        db.execute('give_feedback', (1, 1, 1, 1, 10, manuscripts[2], reviewers[0], manuscripts[2]))
+        db.commit()
+        REVIEWER_INDEX.load(db)
+        return {'reviewer': reviewers[0], **{f'm{index}': manuscript for index, manuscript in enumerate(manuscripts, 1)}}
+
+    def review(self, db: Queries, reviewer: int, lines: List[str]) -> Tuple[int, str]:
+        path = os.path.join(self.directory.name, 'scores.csv')
+        with open(path, 'w') as file:
+            file.write("\n".join(lines) + "\n")
+        session = main.Session()
+        session.login_id, session.role_id, session.role_type = 1, reviewer, 'reviewer'
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            accepted = main.handle_review(db, session, ['--file', path])
+        return accepted, output.getvalue()
+
+    def scores(self, db: Queries, manuscript: int) -> tuple:
+        return db.conn.raw.execute(
+            "SELECT `score_a`, `score_c`, `score_m`, `score_e`, `rec_score` FROM `REVIEW` WHERE `MANUSCRIPT_manuscriptID` = ?;",
+            (manuscript,)).fetchone()
+
+    def test_scores_and_rejected_rows(self) -> None:
+        db = Queries(SQLiteConnection())
+        ids = self.journal(db)
+        self.assertEqual(REVIEWER_INDEX._open_reviews[ids['reviewer']], 3)
+
+        accepted, output = self.review(db, ids['reviewer'], [
+            "manuscriptID,verdict,ascore,cscore,mscore,escore",
+            f"{ids['m1']},accept,1,2,3,4",
+            f"{ids['m2']},reject,5,6,7,8",
+            f"{ids['m3']},accept,9,8,7,6",
+            f"{ids['m4']},accept,1,1,1,1",
+            f"{ids['m5']},accept,1,1,1,1",
+            f"{ids['m1']},reject,1,1,1,1",
+            "bad,row",
+        ])
+
+        self.assertEqual(accepted, 3)
+        self.assertEqual(self.scores(db, ids['m1']), (1, 2, 3, 4, 10))
+        self.assertEqual(self.scores(db, ids['m2']), (5, 6, 7, 8, 0))
+        self.assertEqual(self.scores(db, ids['m3']), (9, 8, 7, 6, 10))
+        self.assertEqual(self.scores(db, ids['m4']), (None,) * 5)
+        self.assertEqual(self.scores(db, ids['m5']), (None,) * 5)
+        self.assertIn(f"Rejected line 5: manuscript {ids['m4']} is not assigned to you", output)
+        self.assertIn(f"Rejected line 6: manuscript {ids['m5']} is not `UnderReview`", output)
+        self.assertIn(f"Rejected line 7: manuscript {ids['m1']} already reviewed on line 2", output)
+        self.assertIn("Rejected line 8: expected manuscriptID,accept|reject", output)
+        # manuscripts 1 and 2 were open; 3 was only re-scored
+        self.assertEqual(REVIEWER_INDEX._open_reviews[ids['reviewer']], 1)
+
+    def test_manuscript_leaving_review_after_validation_is_rejected(self) -> None:
+        db = StatusChangingQueries(SQLiteConnection(), None)
+        ids = self.journal(db)
+        db.manuscript_id = ids['m2']
+
+        accepted, output = self.review(db, ids['reviewer'], [
+            f"{ids['m1']},accept,1,2,3,4",
+            f"{ids['m2']},accept,5,6,7,8",
+        ])
+
+        self.assertEqual(accepted, 1)
+        self.assertEqual(self.scores(db, ids['m1']), (1, 2, 3, 4, 10))
+        self.assertEqual(self.scores(db, ids['m2']), (None,) * 5)
+        self.assertIn(f"Rejected line 2: manuscript {ids['m2']} is no longer `UnderReview`", output)
+        self.assertEqual(REVIEWER_INDEX._open_reviews[ids['reviewer']], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+"""test_sqlite_backend.py: The SQLite stand-in keeps MySQL's transaction behaviour for batch-mode savepoints."""
+
+# Standard Library
+import os
+import sqlite3
+import tempfile
+import unittest
+
+# Local Modules
+from queries import Queries
+from sqlite_backend import SQLiteConnection
+
+
+class SQLiteTransactionTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.database = os.path.join(self.directory.name, 'journal.db')
+        self.db = Queries(SQLiteConnection(self.database))
+        self.db.defer_commits = True
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.directory.cleanup()
+
+    def committed_editors(self) -> int:
+        other = sqlite3.connect(self.database)
+        try:
+            return other.execute("SELECT COUNT(*) FROM `EDITOR`;").fetchone()[0]
+        finally:
+            other.close()
+
+    def test_released_savepoint_commits_nothing(self) -> None:
+        with self.db.atomic():
+            self.db.execute('register_editor', ('E', 'x'))
+        self.db.commit()  # deferred in batch mode
+        self.assertEqual(self.committed_editors(), 0)
+
+    def test_outer_rollback_undoes_atomic_blocks(self) -> None:
+        for name in ('first', 'second'):
+            with self.db.atomic():
+                self.db.execute('register_editor', (name, 'x'))
+        self.db.rollback()
+        self.assertEqual(self.committed_editors(), 0)
+        self.assertEqual(self.db.fetchall('export_EDITOR'), [])
+
+    def test_flush_commits_the_batch(self) -> None:
+        with self.db.atomic():
+            self.db.execute('register_editor', ('E', 'x'))
+        self.db.flush()
+        self.assertEqual(self.committed_editors(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()